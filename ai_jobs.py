@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from identity_cache import MISSING, TTLCache
+
+AI_WORKERS = int(os.getenv('AI_WORKERS', '4'))
+# Successful analyses of the same input are reused for this long
+ANALYSIS_CACHE_TTL = int(os.getenv('ANALYSIS_CACHE_TTL', str(6 * 3600)))
+# Finished jobs stay pollable for this long
+JOB_TTL = int(os.getenv('ANALYSIS_JOB_TTL', '3600'))
+# Job IDs of cache hits: the prefix followed by the analysis key
+CACHED_PREFIX = 'r'
+
+
+def analysis_key(summoner_name, match_history):
+    """Stable hash of an analysis request, used as the result cache key"""
+    payload = json.dumps([summoner_name, match_history], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisJobs:
+    """Runs AI analyses on a background executor and caches their results.
+
+    ``generate(summoner_name, match_history)`` must return ``(text, ok)``;
+    only results with ``ok`` set are cached, so transient API errors are
+    retried on the next request. Identical requests submitted while one is
+    running share its job.
+
+    Running jobs are held outside any cache, so they can't be evicted while
+    clients poll them; finished jobs stay pollable for ``job_ttl``. A cache
+    hit registers nothing: its job ID names the cached result itself.
+    """
+
+    def __init__(self, generate, workers=AI_WORKERS, cache_ttl=ANALYSIS_CACHE_TTL, job_ttl=JOB_TTL):
+        self.generate = generate
+        self.cache_ttl = cache_ttl
+        self.job_ttl = job_ttl
+        # analysis key -> (summoner_name, text, finished_at)
+        self.results = TTLCache()
+        # Finished jobs only; running ones are in _running (key -> job) and _active (id -> job)
+        self.jobs = TTLCache()
+        self._running = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai')
+
+    def cached(self, summoner_name, match_history):
+        """Return the cached analysis for this input, or None"""
+        result = self.results.get(analysis_key(summoner_name, match_history))
+        return None if result is MISSING else result[1]
+
+    def store(self, summoner_name, match_history, text):
+        """Cache an analysis produced outside a job (e.g. a streamed one)"""
+        self.results.set(analysis_key(summoner_name, match_history), (summoner_name, text, time.time()),
+                         self.cache_ttl)
+
+    def submit(self, summoner_name, match_history):
+        """Start (or join) an analysis job and return its state dict"""
+        key = analysis_key(summoner_name, match_history)
+        with self._lock:
+            cached = self._cached_job(key)
+            if cached is not None:
+                return cached
+
+            job = self._running.get(key)
+            if job is not None:
+                return self.public(job)
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'key': key,
+                'summoner_name': summoner_name,
+                'status': 'queued',
+                'analysis': None,
+                'error': None,
+                'cached': False,
+                'created_at': time.time(),
+                'finished_at': None,
+            }
+            self._running[key] = self._active[job['id']] = job
+            job['future'] = self._executor.submit(self._run, job, summoner_name, match_history)
+        return self.public(job)
+
+    def _cached_job(self, key):
+        """Public state of a finished job for a cached result, or None"""
+        result = self.results.get(key)
+        if result is MISSING:
+            return None
+        summoner_name, text, finished_at = result
+        return {
+            'id': CACHED_PREFIX + key,
+            'summoner_name': summoner_name,
+            'status': 'done',
+            'analysis': text,
+            'error': None,
+            'cached': True,
+            'created_at': finished_at,
+            'finished_at': finished_at,
+        }
+
+    def _run(self, job, summoner_name, match_history):
+        job['status'] = 'running'
+        try:
+            text, ok = self.generate(summoner_name, match_history)
+            if ok:
+                self.results.set(job['key'], (summoner_name, text, time.time()), self.cache_ttl)
+            job.update(status='done', analysis=text)
+            return text
+        except Exception as e:
+            job.update(status='error', error=str(e))
+            raise
+        finally:
+            job['finished_at'] = time.time()
+            with self._lock:
+                self.jobs.set(job['id'], job, self.job_ttl)
+                self._active.pop(job['id'], None)
+                self._running.pop(job['key'], None)
+
+    def _find(self, job_id):
+        """(job, None) for a registered job, (None, public state) for a cache hit, or (None, None)"""
+        with self._lock:
+            job = self._active.get(job_id)
+        if job is None:
+            job = self.jobs.get(job_id)
+        if job is not MISSING:
+            return job, None
+        if job_id.startswith(CACHED_PREFIX):
+            return None, self._cached_job(job_id[len(CACHED_PREFIX):])
+        return None, None
+
+    def get(self, job_id):
+        """Return the public state of a job, or None if unknown or expired"""
+        job, cached = self._find(job_id)
+        return cached if job is None else self.public(job)
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes; returns its state (still running if ``timeout`` passed)"""
+        job, cached = self._find(job_id)
+        if job is None:
+            return cached
+        future = job.get('future')
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+        return self.public(job)
+
+    @staticmethod
+    def public(job):
+        return {name: value for name, value in job.items() if name not in ('future', 'key')}
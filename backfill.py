@@ -0,0 +1,239 @@
+"""Bulk match-history backfill.
+
+Pages through the full match/v5 ID history of each player and streams
+the match payloads into the local match store with a bounded pool of
+fetchers. All calls run in the rate limiter's background lane. Progress
+is checkpointed after every page, so a crash or a long rate-limit stall
+resumes where it stopped. Matches whose fetch failed with a retryable
+error (429 after the client's retries, 5xx, network errors) are kept in
+the checkpoint and retried on the next run.
+
+    python backfill.py "Player#EUW" <puuid> ...
+    python backfill.py --file players.txt --workers 4
+    python backfill.py --region na1 "Player#NA1"
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+from urllib.parse import quote
+
+from match_store import MatchStore
+from rate_limiter import BACKGROUND
+from regions import UnknownRegion, get_region
+from riot_client import RiotClient
+from telemetry import configure_logging, log_event
+
+DEFAULT_CHECKPOINT = os.path.join('data', 'backfill-checkpoint.json')
+# match/v5 allows at most 100 IDs per page
+PAGE_SIZE = 100
+# Statuses worth fetching again later; anything else (e.g. 404) is final
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class Checkpoint:
+    """Per-player paging progress persisted as JSON (written atomically)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.players = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.players = json.load(f)
+
+    def get(self, player):
+        with self._lock:
+            return dict(self.players.get(player, {}))
+
+    def update(self, player, **fields):
+        with self._lock:
+            self.players.setdefault(player, {}).update(fields)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.players, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+class Backfill:
+    """Bounded fetch pipeline: one pager per player feeds ``workers`` match fetchers"""
+
+    def __init__(self, riot, match_store, region, checkpoint, workers=4, queue_size=50):
+        self.riot = riot
+        self.match_store = match_store
+        self.region = region
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stats_lock = threading.Lock()
+        self.stats = {'fetched': 0, 'skipped': 0, 'failed': 0, 'missing': 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def resolve_puuid(self, player):
+        """Accept either a PUUID or a gamename#tag Riot ID"""
+        saved = self.checkpoint.get(player).get('puuid')
+        if saved:
+            return saved
+        if '#' not in player:
+            return player
+        gamename, tag = player.split('#', 1)
+        response = self.riot.get(
+            f"{self.region.account_url}/riot/account/v1/accounts/by-riot-id/{quote(gamename, safe='')}/{quote(tag, safe='')}",
+            priority=BACKGROUND
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Could not resolve {player}: HTTP {response.status_code}")
+        return response.json()['puuid']
+
+    def _fetcher(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                match_id, done, failed = item
+                try:
+                    response = self.riot.get(f"{self.region.regional_url}/lol/match/v5/matches/{match_id}", priority=BACKGROUND)
+                    if response.status_code == 200:
+                        self.match_store.put(match_id, response.json())
+                        self._count('fetched')
+                    elif response.status_code in RETRYABLE_STATUSES:
+                        log_event('backfill_match_failed', level=logging.WARNING, match_id=match_id,
+                                  status=response.status_code)
+                        failed.append(match_id)
+                        self._count('failed')
+                    else:
+                        log_event('backfill_match_missing', level=logging.WARNING, match_id=match_id,
+                                  status=response.status_code)
+                        self._count('missing')
+                except Exception as e:
+                    log_event('backfill_match_failed', level=logging.WARNING, match_id=match_id, error=str(e))
+                    failed.append(match_id)
+                    self._count('failed')
+                finally:
+                    done.release()
+            finally:
+                self._queue.task_done()
+
+    def fetch_matches(self, match_ids):
+        """Fetch and store the matches not stored yet; returns the IDs that failed retryably"""
+        done = threading.Semaphore(0)
+        failed = []
+        queued = 0
+        for match_id in match_ids:
+            if match_id in self.match_store:
+                self._count('skipped')
+                continue
+            self._queue.put((match_id, done, failed))
+            queued += 1
+        for _ in range(queued):
+            done.acquire()
+        return failed
+
+    def backfill_player(self, player):
+        progress = self.checkpoint.get(player)
+        # Earlier failures first; whatever fails again stays in the checkpoint
+        if progress.get('failed'):
+            failed = self.fetch_matches(progress['failed'])
+            self.checkpoint.update(player, failed=failed)
+            log_event('backfill_retried', sample=1.0, player=player, retried=len(progress['failed']),
+                      failed=len(failed))
+        if progress.get('complete'):
+            log_event('backfill_already_complete', sample=1.0, player=player, match_ids=progress.get('start', 0))
+            return
+
+        puuid = self.resolve_puuid(player)
+        start = progress.get('start', 0)
+        self.checkpoint.update(player, puuid=puuid, start=start)
+
+        while True:
+            response = self.riot.get(
+                f"{self.region.regional_url}/lol/match/v5/matches/by-puuid/{puuid}/ids",
+                params={'start': start, 'count': PAGE_SIZE},
+                priority=BACKGROUND
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"{player}: match IDs page at {start} failed with HTTP {response.status_code}")
+            match_ids = response.json()
+            if not match_ids:
+                self.checkpoint.update(player, complete=True)
+                log_event('backfill_player_complete', sample=1.0, player=player, match_ids=start)
+                return
+
+            # The whole page is fetched before the checkpoint advances, and
+            # its failures are saved with it, so a restart never loses matches
+            failed = self.fetch_matches(match_ids)
+            start += len(match_ids)
+            self.checkpoint.update(player, start=start, failed=self.checkpoint.get(player).get('failed', []) + failed)
+            log_event('backfill_progress', sample=1.0, player=player, match_ids=start, **self.stats)
+
+    def run(self, players):
+        threads = [threading.Thread(target=self._fetcher, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for player in players:
+                try:
+                    self.backfill_player(player)
+                except Exception as e:
+                    # Progress so far is checkpointed; the next run resumes here
+                    log_event('backfill_player_stopped', level=logging.WARNING, player=player, error=str(e))
+        finally:
+            for _ in threads:
+                self._queue.put(None)
+            for thread in threads:
+                thread.join()
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Backfill full match history into the local match store')
+    parser.add_argument('players', nargs='*', help='PUUIDs or Riot IDs (gamename#tag)')
+    parser.add_argument('--file', help='file with one PUUID or Riot ID per line')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent match fetchers')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='checkpoint file path')
+    parser.add_argument('--restart', action='store_true', help='ignore saved progress for these players')
+    parser.add_argument('--region', help='platform the players are on, e.g. eun1 or na1 (default: RIOT_PLATFORM)')
+    args = parser.parse_args(argv)
+
+    players = list(args.players)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            players.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not players:
+        parser.error('no players given')
+
+    try:
+        region = get_region(args.region)
+    except UnknownRegion as e:
+        parser.error(str(e))
+
+    # Same configuration and SQLite file as the app, but none of its listeners:
+    # the running app picks the new rows up through MatchStore.catch_up
+    configure_logging()
+    riot = RiotClient(os.getenv('RIOT_API_KEY', ''))
+    match_store = MatchStore()
+
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.restart:
+        for player in players:
+            checkpoint.update(player, start=0, complete=False, failed=[])
+
+    try:
+        stats = Backfill(riot, match_store, region, checkpoint, workers=args.workers).run(players)
+    finally:
+        riot.close()
+        match_store.close()
+    print(f"Done: {stats}")
+
+
+if __name__ == '__main__':
+    main()
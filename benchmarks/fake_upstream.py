@@ -0,0 +1,300 @@
+"""Local stand-in for the Riot API and OpenRouter.
+
+Serves the account, summoner, league, match and spectator endpoints the
+app uses plus OpenRouter chat completions (plain and streamed), with
+deterministic data derived from the requested IDs. Latency, error rate
+and rate-limit headers are configurable, so the app can be benchmarked
+without an API key:
+
+    python benchmarks/fake_upstream.py --port 8900 --latency 80 --jitter 40 --error-rate 0.01
+
+Point the app at it with RIOT_BASE_URL, RIOT_REGIONAL_URL and
+OPENROUTE_API_URL (benchmarks/run.py does this for you).
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+CHAMPIONS = [
+    (103, 'Ahri'), (266, 'Aatrox'), (84, 'Akali'), (12, 'Alistar'), (22, 'Ashe'), (53, 'Blitzcrank'),
+    (51, 'Caitlyn'), (122, 'Darius'), (119, 'Draven'), (81, 'Ezreal'), (86, 'Garen'), (104, 'Graves'),
+    (39, 'Irelia'), (202, 'Jhin'), (222, 'Jinx'), (145, 'Kaisa'), (64, 'LeeSin'), (99, 'Lux'),
+    (21, 'MissFortune'), (111, 'Nautilus'), (555, 'Pyke'), (92, 'Riven'), (235, 'Senna'), (412, 'Thresh'),
+    (4, 'TwistedFate'), (67, 'Vayne'), (157, 'Yasuo'), (777, 'Yone'), (238, 'Zed'), (142, 'Zoe'),
+]
+TIERS = ['IRON', 'BRONZE', 'SILVER', 'GOLD', 'PLATINUM', 'EMERALD', 'DIAMOND']
+DIVISIONS = ['IV', 'III', 'II', 'I']
+ANALYSIS_TEXT = (
+    "**Mocne strony:** dobre KDA i stabilny wybór championów.\n"
+    "**Obszary do poprawy:** pozycjonowanie w teamfightach i kontrola wizji.\n"
+    "**Rekomendacje:** więcej Control Wardów i spokojniejsza gra w late game."
+)
+
+
+def seeded(*parts):
+    """Deterministic Random for a tuple of IDs"""
+    return random.Random(hashlib.sha1('|'.join(map(str, parts)).encode('utf-8')).digest())
+
+
+def puuid_for(name):
+    return hashlib.sha1(name.casefold().encode('utf-8')).hexdigest() * 2
+
+
+class RateLimitWindows:
+    """Counts requests per ``count:seconds`` window the way Riot reports them"""
+
+    def __init__(self, spec):
+        self.limits = [tuple(int(x) for x in part.split(':')) for part in spec.split(',') if part]
+        self.hits = deque()
+        self.lock = threading.Lock()
+
+    def hit(self):
+        """(header value, count header value, seconds to wait or 0)"""
+        now = time.monotonic()
+        with self.lock:
+            longest = max((seconds for _, seconds in self.limits), default=0)
+            while self.hits and self.hits[0] <= now - longest:
+                self.hits.popleft()
+            self.hits.append(now)
+            counts, retry_after = [], 0
+            for limit, seconds in self.limits:
+                count = sum(1 for t in self.hits if t > now - seconds)
+                counts.append(f"{count}:{seconds}")
+                if count > limit:
+                    retry_after = max(retry_after, seconds)
+        limit_header = ','.join(f"{limit}:{seconds}" for limit, seconds in self.limits)
+        return limit_header, ','.join(counts), retry_after
+
+
+class FakeUpstream:
+    def __init__(self, latency=50, jitter=20, error_rate=0.0, in_game_rate=1.0,
+                 llm_latency=1500, llm_chunks=20, rate_limit='', enforce_limits=False):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.in_game_rate = in_game_rate
+        self.llm_latency = llm_latency / 1000
+        self.llm_chunks = llm_chunks
+        self.rate_limit = RateLimitWindows(rate_limit) if rate_limit else None
+        self.enforce_limits = enforce_limits
+        # Owner key (see match_ids) -> PUUID whose history was paged
+        self.owners = {}
+
+    def delay(self, base):
+        time.sleep(max(0.0, base + random.uniform(-self.jitter, self.jitter)))
+
+    # Riot endpoints: each returns (status, body)
+
+    def account(self, name, tag):
+        return 200, {'puuid': puuid_for(f"{name}#{tag}"), 'gameName': name, 'tagLine': tag}
+
+    def summoner(self, puuid):
+        rng = seeded('summoner', puuid)
+        return 200, {
+            'id': f"S-{puuid[:24]}", 'puuid': puuid,
+            'profileIconId': rng.randint(1, 5000), 'summonerLevel': rng.randint(30, 700),
+        }
+
+    def league_entries(self, summoner_id):
+        rng = seeded('league', summoner_id)
+        wins, losses = rng.randint(10, 300), rng.randint(10, 300)
+        return 200, [{
+            'queueType': 'RANKED_SOLO_5x5', 'tier': rng.choice(TIERS), 'rank': rng.choice(DIVISIONS),
+            'leaguePoints': rng.randint(0, 99), 'wins': wins, 'losses': losses, 'summonerId': summoner_id,
+        }]
+
+    def apex_league(self, tier):
+        rng = seeded('apex', tier)
+        size = {'challenger': 300, 'grandmaster': 700, 'master': 3000}[tier]
+        return 200, {'tier': tier.upper(), 'entries': [
+            {'puuid': puuid_for(f"{tier}{i}"), 'leaguePoints': rng.randint(0, 1500),
+             'wins': rng.randint(50, 600), 'losses': rng.randint(50, 600), 'hotStreak': rng.random() < 0.1}
+            for i in range(size)
+        ]}
+
+    def match_ids(self, puuid, start, count):
+        owner = int(puuid[:8], 16) % 10**6
+        self.owners[owner] = puuid
+        return 200, [f"EUW1_{owner * 1000 + i}" for i in range(start, min(start + count, 1000))]
+
+    def match(self, match_id):
+        rng = seeded('match', match_id)
+        game_id = int(match_id.split('_')[1])
+        participants = []
+        winner = rng.choice([100, 200])
+        for i in range(10):
+            champion_id, champion_name = rng.choice(CHAMPIONS)
+            team_id = 100 if i < 5 else 200
+            participants.append({
+                'puuid': puuid_for(f"player{rng.randint(0, 10**6)}"), 'championId': champion_id,
+                'championName': champion_name, 'teamId': team_id, 'win': team_id == winner,
+                'kills': rng.randint(0, 15), 'deaths': rng.randint(0, 12), 'assists': rng.randint(0, 20),
+            })
+        # The player whose history was paged really played in their own matches
+        owner = game_id // 1000
+        participants[owner % 10]['puuid'] = self.owners.get(owner, participants[owner % 10]['puuid'])
+        return 200, {
+            'metadata': {'matchId': match_id},
+            'info': {
+                'gameId': game_id, 'platformId': 'EUW1', 'gameMode': 'CLASSIC', 'queueId': 420,
+                'gameDuration': rng.randint(900, 2400),
+                'gameEndTimestamp': int(time.time() * 1000) - game_id % 1000 * 3600 * 1000,
+                'participants': participants,
+            },
+        }
+
+    def active_game(self, puuid):
+        rng = seeded('game', puuid, int(time.time() // 1800))
+        if rng.random() >= self.in_game_rate:
+            return 404, {'status': {'message': 'Data not found', 'status_code': 404}}
+        game_id = rng.randint(10**9, 10**10)
+        participants = []
+        for i in range(10):
+            champion_id, _ = rng.choice(CHAMPIONS)
+            participant_puuid = puuid if i == 0 else puuid_for(f"{game_id}-{i}")
+            participants.append({
+                'puuid': participant_puuid, 'summonerId': f"S-{participant_puuid[:24]}",
+                'summonerName': f"Player{i}", 'championId': champion_id, 'teamId': 100 if i < 5 else 200,
+                'spell1Id': 4, 'spell2Id': rng.choice([7, 11, 12, 14]), 'profileIconId': rng.randint(1, 5000),
+            })
+        started = int(time.time() // 1800) * 1800
+        return 200, {
+            'gameId': game_id, 'platformId': 'EUW1', 'gameMode': 'CLASSIC', 'gameQueueConfigId': 420,
+            'gameLength': int(time.time()) - started, 'participants': participants,
+        }
+
+    def route(self, path, query):
+        match = re.fullmatch(r'/riot/account/v1/accounts/by-riot-id/([^/]+)/([^/]+)', path)
+        if match:
+            return self.account(unquote(match.group(1)), unquote(match.group(2)))
+        match = re.fullmatch(r'/riot/account/v1/accounts/by-puuid/([^/]+)', path)
+        if match:
+            return 200, {'puuid': match.group(1), 'gameName': f"Player{match.group(1)[:6]}", 'tagLine': 'EUW'}
+        match = re.fullmatch(r'/riot/account/v1/region/by-game/lol/by-puuid/([^/]+)', path)
+        if match:
+            return 200, {'puuid': match.group(1), 'game': 'lol', 'region': 'euw1'}
+        match = re.fullmatch(r'/lol/summoner/v4/summoners/by-puuid/([^/]+)', path)
+        if match:
+            return self.summoner(match.group(1))
+        match = re.fullmatch(r'/lol/league/v4/entries/by-summoner/([^/]+)', path)
+        if match:
+            return self.league_entries(match.group(1))
+        match = re.fullmatch(r'/lol/league/v4/(challenger|grandmaster|master)leagues/by-queue/[^/]+', path)
+        if match:
+            return self.apex_league(match.group(1))
+        match = re.fullmatch(r'/lol/match/v5/matches/by-puuid/([^/]+)/ids', path)
+        if match:
+            return self.match_ids(match.group(1), int(query.get('start', ['0'])[0]), int(query.get('count', ['20'])[0]))
+        match = re.fullmatch(r'/lol/match/v5/matches/([A-Z0-9]+_\d+)', path)
+        if match:
+            return self.match(match.group(1))
+        match = re.fullmatch(r'/lol/spectator/v5/active-games/by-puuid/([^/]+)', path)
+        if match:
+            return self.active_game(match.group(1))
+        if path.startswith('/lol/spectator/v4/'):
+            # Retired endpoints answer 403, as they do for real keys
+            return 403, {'status': {'message': 'Forbidden', 'status_code': 403}}
+        return 404, {'status': {'message': 'Not found', 'status_code': 404}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    upstream = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        upstream = self.upstream
+        parts = urlsplit(self.path)
+        headers = {}
+        if upstream.rate_limit:
+            limit, count, retry_after = upstream.rate_limit.hit()
+            headers.update({'X-App-Rate-Limit': limit, 'X-App-Rate-Limit-Count': count})
+            if retry_after and upstream.enforce_limits:
+                headers.update({'Retry-After': str(retry_after), 'X-Rate-Limit-Type': 'application'})
+                return self.send_json(429, {'status': {'message': 'Rate limit exceeded', 'status_code': 429}}, headers)
+        upstream.delay(upstream.latency)
+        if random.random() < upstream.error_rate:
+            return self.send_json(503, {'status': {'message': 'Service unavailable', 'status_code': 503}}, headers)
+        status, body = upstream.route(parts.path, parse_qs(parts.query))
+        self.send_json(status, body, headers)
+
+    def do_POST(self):
+        upstream = self.upstream
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if urlsplit(self.path).path != '/api/v1/chat/completions':
+            return self.send_json(404, {'error': 'not found'})
+        if random.random() < upstream.error_rate:
+            return self.send_json(502, {'error': {'message': 'Upstream error'}})
+        if not payload.get('stream'):
+            upstream.delay(upstream.llm_latency)
+            return self.send_json(200, {'choices': [{'message': {'role': 'assistant', 'content': ANALYSIS_TEXT}}]})
+
+        # Server-Sent Events, the way OpenRouter streams completions
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        words = ANALYSIS_TEXT.split(' ')
+        step = max(1, len(words) // upstream.llm_chunks)
+        for i in range(0, len(words), step):
+            upstream.delay(upstream.llm_latency / upstream.llm_chunks)
+            chunk = {'choices': [{'delta': {'content': ' '.join(words[i:i + step]) + ' '}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+def serve(port, upstream):
+    handler = type('BoundHandler', (Handler,), {'upstream': upstream})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fake Riot API and OpenRouter server for benchmarks')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=50, help='mean Riot response latency (ms)')
+    parser.add_argument('--jitter', type=float, default=20, help='uniform latency jitter (+/- ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 5xx')
+    parser.add_argument('--in-game-rate', type=float, default=1.0, help='share of players in an active game')
+    parser.add_argument('--llm-latency', type=float, default=1500, help='OpenRouter completion time (ms)')
+    parser.add_argument('--rate-limit', default='', help='X-App-Rate-Limit to report, e.g. 500:10,30000:600')
+    parser.add_argument('--enforce-limits', action='store_true', help='answer 429 once a window is exceeded')
+    args = parser.parse_args(argv)
+
+    upstream = FakeUpstream(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, in_game_rate=args.in_game_rate,
+        llm_latency=args.llm_latency, rate_limit=args.rate_limit, enforce_limits=args.enforce_limits,
+    )
+    server = serve(args.port, upstream)
+    print(f"Fake upstream listening on http://127.0.0.1:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
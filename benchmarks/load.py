@@ -0,0 +1,162 @@
+"""Closed-loop load generator for the app's JSON APIs.
+
+Each of ``--concurrency`` workers sends requests back to back for
+``--duration`` seconds against one scenario and the latencies are reported
+as p50/p95/p99 and throughput:
+
+    python benchmarks/load.py --base-url http://127.0.0.1:5000 --scenario summoner --concurrency 50
+
+Players are drawn from a pool of ``--players`` Riot IDs, so a small pool
+measures the cached path and a large one the upstream path.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+import requests
+
+SCENARIOS = ('summoner', 'live-game', 'analyze')
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def riot_id(index):
+    return f"Bench{index}#EUW"
+
+
+def send(session, base_url, scenario, player):
+    if scenario == 'summoner':
+        return session.get(f"{base_url}/api/summoner/{quote(player, safe='')}", timeout=60)
+    if scenario == 'live-game':
+        return session.get(f"{base_url}/api/live-game/{quote(player, safe='')}", timeout=60)
+    return session.post(f"{base_url}/api/analyze-performance", timeout=120, json={
+        'summoner_name': player,
+        'match_history': [
+            {'champion': 'Ahri', 'result': 'Victory', 'kda': '7/2/9', 'duration': '31:05', 'gameMode': 'CLASSIC'},
+            {'champion': 'Zed', 'result': 'Defeat', 'kda': '3/6/4', 'duration': '27:40', 'gameMode': 'CLASSIC'},
+        ],
+    })
+
+
+def run_scenario(base_url, scenario, concurrency=20, duration=20.0, players=100, warmup=2.0):
+    """Drive one scenario and return its summary dict"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        local_latencies, local_statuses = [], {}
+        while True:
+            started = time.monotonic()
+            if started >= stop_at:
+                break
+            try:
+                status = send(session, base_url, scenario, riot_id(rng.randrange(players))).status_code
+            except requests.RequestException:
+                status = 'error'
+            finished = time.monotonic()
+            if started >= measure_from:
+                local_latencies.append(finished - started)
+                local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    ok = sum(count for status, count in statuses.items() if status in (200, 202))
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'duration': duration,
+        'players': players,
+        'requests': len(latencies),
+        'errors': len(latencies) - ok,
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'throughput': round(len(latencies) / duration, 2),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+    }
+
+
+def format_summary(summary):
+    return (
+        f"{summary['scenario']:<10} c={summary['concurrency']:<4} "
+        f"{summary['throughput']:>8.1f} req/s  p50 {summary['p50_ms']:>8.1f} ms  "
+        f"p95 {summary['p95_ms']:>8.1f} ms  p99 {summary['p99_ms']:>8.1f} ms  "
+        f"errors {summary['errors']}/{summary['requests']}"
+    )
+
+
+def compare(results, baseline, tolerance):
+    """Human readable regressions of ``results`` against ``baseline`` (both keyed by scenario)"""
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if previous[key] and current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f"{scenario}: {key} {previous[key]} -> {current[key]}")
+        if previous['throughput'] and current['throughput'] < previous['throughput'] * (1 - tolerance):
+            regressions.append(f"{scenario}: throughput {previous['throughput']} -> {current['throughput']}")
+        if current['errors'] > previous['errors'] + max(1, previous['requests'] * tolerance / 10):
+            regressions.append(f"{scenario}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the app and report latency percentiles')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='repeatable; default: all')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds per scenario')
+    parser.add_argument('--warmup', type=float, default=2, help='unmeasured seconds before each scenario')
+    parser.add_argument('--players', type=int, default=100, help='size of the Riot ID pool')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for scenario in args.scenario or SCENARIOS:
+        results[scenario] = run_scenario(
+            args.base_url, scenario, args.concurrency, args.duration, args.players, args.warmup
+        )
+        print(format_summary(results[scenario]), flush=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
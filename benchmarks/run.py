@@ -0,0 +1,148 @@
+"""End-to-end benchmark: fake upstream + app + load generator.
+
+Starts benchmarks/fake_upstream.py in-process, boots the app against it
+(gunicorn by default, ``--server dev`` for the Flask dev server) with a
+throwaway match store, waits for /health and runs benchmarks/load.py.
+Results are compared with benchmarks/baseline.json and the exit status is
+non-zero on a regression:
+
+    python benchmarks/run.py
+    python benchmarks/run.py --update-baseline   # after an intended change
+
+Run it before and after every performance change.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+import fake_upstream
+import load
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Production-key sized limits, reported by the fake server and used by the app's limiter
+RATE_LIMIT = '500:10,30000:600'
+
+
+def app_env(upstream_url, workdir, port, rate_limit=RATE_LIMIT):
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'RIOT_API_KEY': 'RGAPI-benchmark',
+        'OPENROUTE_API_KEY': 'sk-benchmark',
+        'RIOT_BASE_URL': upstream_url,
+        'RIOT_REGIONAL_URL': upstream_url,
+        'OPENROUTE_API_URL': f"{upstream_url}/api/v1/chat/completions",
+        'RIOT_APP_RATE_LIMIT': rate_limit,
+        'MATCH_STORE_PATH': os.path.join(workdir, 'matches.sqlite3'),
+        'LOG_LEVEL': 'WARNING',
+        # Keep the run offline; the built-in tables are enough
+        'DDRAGON_DOWNLOAD': '0',
+    })
+    return env
+
+
+def start_app(server, env, log):
+    if server == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'main:app']
+    else:
+        command = [sys.executable, 'main.py']
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def wait_healthy(base_url, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited with status {process.returncode}")
+        try:
+            if requests.get(f"{base_url}/health", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError('app did not become healthy')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the app against the fake upstream')
+    parser.add_argument('--server', choices=('gunicorn', 'dev'), default='gunicorn')
+    parser.add_argument('--app-port', type=int, default=5055)
+    parser.add_argument('--upstream-port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=80, help='mean Riot latency (ms)')
+    parser.add_argument('--jitter', type=float, default=30, help='Riot latency jitter (ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--llm-latency', type=float, default=1500, help='OpenRouter completion time (ms)')
+    parser.add_argument('--rate-limit', default=RATE_LIMIT, help='Riot app rate limit, e.g. 500:10,30000:600')
+    parser.add_argument('--scenario', action='append', choices=load.SCENARIOS, help='repeatable; default: all')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--players', type=int, default=100)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--output', help='also write the results to this file')
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    args = parser.parse_args(argv)
+
+    upstream = fake_upstream.FakeUpstream(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        llm_latency=args.llm_latency, rate_limit=args.rate_limit,
+    )
+    upstream_server = fake_upstream.serve(args.upstream_port, upstream)
+    threading.Thread(target=upstream_server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{args.app_port}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        log_path = os.path.join(workdir, 'app.log')
+        with open(log_path, 'wb') as log:
+            env = app_env(f"http://127.0.0.1:{args.upstream_port}", workdir, args.app_port, args.rate_limit)
+            process = start_app(args.server, env, log)
+            try:
+                wait_healthy(base_url, process)
+                results = {}
+                for scenario in args.scenario or load.SCENARIOS:
+                    results[scenario] = load.run_scenario(
+                        base_url, scenario, args.concurrency, args.duration, args.players
+                    )
+                    print(load.format_summary(results[scenario]), flush=True)
+            except RuntimeError as e:
+                print(f"Benchmark failed: {e}")
+                with open(log_path, encoding='utf-8', errors='replace') as f:
+                    print(f.read()[-4000:])
+                return 2
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                upstream_server.shutdown()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = load.compare(results, json.load(f), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print('No regressions against the baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import json
+import os
+import threading
+import time
+from array import array
+
+from telemetry import log_event
+
+# Minimum seconds between rebuilds of the served JSON while matches stream in
+CHAMPION_STATS_TTL = int(os.getenv('CHAMPION_STATS_TTL', '60'))
+# Champions with fewer games are left out of the win-model strength map
+MIN_STRENGTH_GAMES = int(os.getenv('CHAMPION_STRENGTH_MIN_GAMES', '50'))
+
+
+class ChampionTable:
+    """Per-champion accumulators stored column-wise, one slot per champion.
+
+    Each column is a typed array indexed by slot, so folding in a match is
+    a handful of array increments per participant and reading a column
+    never touches per-champion objects.
+    """
+
+    COLUMNS = ('games', 'wins', 'kills', 'deaths', 'assists', 'duration')
+
+    def __init__(self):
+        self.slots = {}
+        self.champion_ids = array('H')
+        self.names = []
+        self.games = array('L')
+        self.wins = array('L')
+        self.kills = array('Q')
+        self.deaths = array('Q')
+        self.assists = array('Q')
+        # Sum of game lengths in seconds
+        self.duration = array('Q')
+        self.matches = 0
+
+    def slot(self, champion_id, name):
+        slot = self.slots.get(champion_id)
+        if slot is None:
+            slot = self.slots[champion_id] = len(self.champion_ids)
+            self.champion_ids.append(champion_id)
+            self.names.append(name)
+            for column in self.COLUMNS:
+                getattr(self, column).append(0)
+        return slot
+
+    def add(self, record):
+        """Group one MatchRecord's participant columns by champion"""
+        self.matches += 1
+        duration = record.game_duration
+        for i, champion_id in enumerate(record.champion_ids):
+            slot = self.slot(champion_id, record.champion_names[i])
+            self.games[slot] += 1
+            self.wins[slot] += record.wins[i]
+            self.kills[slot] += record.kills[i]
+            self.deaths[slot] += record.deaths[i]
+            self.assists[slot] += record.assists[i]
+            self.duration[slot] += duration
+
+    def rows(self):
+        matches = self.matches
+        rows = []
+        for slot, champion_id in enumerate(self.champion_ids):
+            games = self.games[slot]
+            if not games:
+                continue
+            deaths = self.deaths[slot]
+            rows.append({
+                'championId': champion_id,
+                'champion': self.names[slot],
+                'games': games,
+                'wins': self.wins[slot],
+                'pickRate': round(100 * games / matches, 2) if matches else 0.0,
+                'winRate': round(100 * self.wins[slot] / games, 2),
+                'avgKills': round(self.kills[slot] / games, 2),
+                'avgDeaths': round(deaths / games, 2),
+                'avgAssists': round(self.assists[slot] / games, 2),
+                'kda': round((self.kills[slot] + self.assists[slot]) / max(deaths, 1), 2),
+                'avgGameLength': round(self.duration[slot] / games),
+            })
+        rows.sort(key=lambda row: (-row['games'], row['champion']))
+        return rows
+
+
+class ChampionStats:
+    """Champion aggregates over every stored match, kept current by a store listener.
+
+    The table is built once from the match store in a background thread and
+    then updated as each new match is stored, including matches other
+    processes store (see MatchStore.catch_up). Readers get a pre-encoded JSON
+    body that is rebuilt at most every ``ttl`` seconds.
+    """
+
+    def __init__(self, match_store, ttl=CHAMPION_STATS_TTL):
+        self.match_store = match_store
+        self.ttl = ttl
+        self.table = ChampionTable()
+        self.ready = False
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._cached = None
+        self._thread = None
+        match_store.add_listener(self.ingest)
+
+    def ingest(self, record):
+        with self._lock:
+            if record.match_id in self._seen:
+                return
+            self._seen.add(record.match_id)
+            self.table.add(record)
+            self._version += 1
+
+    def _build(self):
+        started = time.monotonic()
+        for record in self.match_store.iter_records():
+            self.ingest(record)
+        with self._lock:
+            self.ready = True
+            self._version += 1
+        log_event('champion_stats_built', sample=1.0, matches=self.table.matches,
+                  seconds=round(time.monotonic() - started, 1))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._build, daemon=True, name='champion-stats')
+            self._thread.start()
+
+    def payload(self):
+        """JSON bytes for the current table, rebuilt only when stale"""
+        cached = self._cached
+        now = time.monotonic()
+        if cached is not None and cached[3] == self.ready and (
+                cached[0] == self._version or now - cached[1] < self.ttl):
+            return cached[2]
+        with self._lock:
+            version = self._version
+            ready = self.ready
+            body = {
+                'ready': ready,
+                'matches': self.table.matches,
+                'champions': self.table.rows(),
+                'generatedAt': time.time(),
+            }
+        encoded = json.dumps(body, separators=(',', ':')).encode('utf-8')
+        self._cached = (version, now, encoded, ready)
+        return encoded
+
+    def strength(self, min_games=MIN_STRENGTH_GAMES):
+        """champion ID -> win rate (0..1) for champions with enough games"""
+        with self._lock:
+            table = self.table
+            return {
+                table.champion_ids[slot]: table.wins[slot] / table.games[slot]
+                for slot in range(len(table.champion_ids))
+                if table.games[slot] >= min_games
+            }
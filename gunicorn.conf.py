@@ -0,0 +1,35 @@
+# Production server settings: gunicorn -c gunicorn.conf.py main:app
+#
+# Gevent workers run each request in a greenlet. requests, sockets, locks
+# and the worker pools are monkey-patched to cooperative versions, so a
+# request waiting on Riot or OpenRouter only parks its greenlet and one
+# process can hold hundreds of slow upstream calls at once.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Processes; Cloud Run scales by instance, so one is usually enough
+workers = int(os.getenv('WEB_WORKERS', '1'))
+worker_class = 'gevent'
+# Concurrent requests (greenlets) per worker
+worker_connections = int(os.getenv('WEB_CONCURRENCY', '1000'))
+
+# Long enough for a full OpenRouter completion; SSE streams keep writing
+timeout = int(os.getenv('WEB_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 75
+
+accesslog = '-'
+errorlog = '-'
+
+# Greenlets are cheap, so fan-out and connection pools can be much wider
+# than with OS threads; explicit settings still win
+os.environ.setdefault('UPSTREAM_WORKERS', '256')
+os.environ.setdefault('RIOT_POOL_SIZE', '100')
+os.environ.setdefault('AI_WORKERS', '64')
+
+
+def post_worker_init(worker):
+    # Background refreshers run in each worker, after gevent has patched it
+    from main import start_background_tasks
+    start_background_tasks()
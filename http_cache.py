@@ -0,0 +1,131 @@
+import functools
+import gzip
+import hashlib
+import os
+
+from flask import Response, current_app, request
+
+from identity_cache import MISSING, TTLCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '5000'))
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = {
+    'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript',
+}
+
+
+def negotiate_encoding():
+    """Best content coding the client accepts: 'br', 'gzip' or None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+class CachedBody:
+    """Rendered response body with its strong ETag and lazily compressed variants"""
+
+    __slots__ = ('body', 'mimetype', 'etag', '_encoded')
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self._encoded = {}
+
+    def compressible(self):
+        return len(self.body) >= COMPRESS_MIN_SIZE and self.mimetype in COMPRESSIBLE_TYPES
+
+    def variant(self, encoding):
+        """(body, etag) for a content coding; each coding is its own representation"""
+        if encoding is None:
+            return self.body, self.etag
+        encoded = self._encoded.get(encoding)
+        if encoded is None:
+            encoded = self._encoded[encoding] = compress(self.body, encoding)
+        return encoded, f"{self.etag}-{encoding}"
+
+
+def conditional_response(cached, cache_control):
+    """200 with the negotiated variant, or 304 when the client already has it"""
+    encoding = negotiate_encoding() if cached.compressible() else None
+    body, etag = cached.variant(encoding)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=cached.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+class ResponseCache:
+    """Short-lived server-side cache of rendered 200 responses.
+
+    Entries are keyed by view, case-folded path (so each Riot ID has its own
+    entry regardless of spelling) and query string. Every response from a
+    cached view gets a strong ETag, ``If-None-Match`` handling and the
+    route's ``Cache-Control``; large bodies are compressed once per entry.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, metrics=None):
+        self._entries = TTLCache(max_entries)
+        self.metrics = metrics
+
+    def cached(self, ttl, cache_control):
+        """Decorator for a JSON view; ``ttl=0`` adds validators without server-side caching"""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (view.__name__, request.path.casefold(), tuple(sorted(request.args.items(multi=True))))
+                entry = self._entries.get(key) if ttl else MISSING
+                if ttl and self.metrics:
+                    self.metrics.cache('response', entry is not MISSING)
+                if entry is MISSING:
+                    response = current_app.make_response(view(*args, **kwargs))
+                    # Errors, redirects and streams pass through untouched
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    entry = CachedBody(response.get_data(), response.mimetype)
+                    if ttl:
+                        self._entries.set(key, entry, ttl)
+                return conditional_response(entry, cache_control)
+            return wrapper
+        return decorator
+
+    def clear(self):
+        self._entries.clear()
+
+
+def compress_response(response):
+    """after_request hook: compress large uncached text responses"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Riot ID -> PUUID rarely changes (only on a name change)
+ACCOUNT_TTL = int(os.getenv('ACCOUNT_TTL', str(24 * 3600)))
+# Summoner ID for a PUUID is permanent
+SUMMONER_ID_TTL = int(os.getenv('SUMMONER_ID_TTL', str(7 * 24 * 3600)))
+# Level and profile icon go stale quickly
+SUMMONER_TTL = int(os.getenv('SUMMONER_TTL', '300'))
+# How long a 404 is remembered
+NEGATIVE_TTL = int(os.getenv('NEGATIVE_TTL', '60'))
+
+MISSING = object()
+NOT_FOUND = object()
+
+
+class TTLCache:
+    """Thread-safe bounded mapping whose entries expire after a per-entry TTL"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or MISSING when absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class IdentityCache:
+    """Shared cache for Riot ID -> account -> summoner lookups.
+
+    Each field gets its own TTL: the account (and so the PUUID) and the
+    summoner ID are kept for a long time, while the full summoner payload
+    with level and icon expires after a few minutes. 404s are cached as
+    NOT_FOUND for NEGATIVE_TTL seconds.
+
+    Accounts are global, but a PUUID has a separate summoner on every
+    platform it has played on, so summoner entries are keyed by platform.
+    The platform a player is active on is kept as long as the account.
+    """
+
+    def __init__(self, account_ttl=ACCOUNT_TTL, summoner_ttl=SUMMONER_TTL,
+                 summoner_id_ttl=SUMMONER_ID_TTL, negative_ttl=NEGATIVE_TTL):
+        self.account_ttl = account_ttl
+        self.summoner_ttl = summoner_ttl
+        self.summoner_id_ttl = summoner_id_ttl
+        self.negative_ttl = negative_ttl
+        self.accounts = TTLCache()
+        self.summoners = TTLCache()
+        self.summoner_ids = TTLCache()
+        self.platforms = TTLCache()
+
+    @staticmethod
+    def riot_id_key(gamename, tag):
+        # Riot IDs are case-insensitive
+        return f"{gamename}#{tag}".casefold()
+
+    def get_account(self, gamename, tag):
+        return self.accounts.get(self.riot_id_key(gamename, tag))
+
+    def set_account(self, gamename, tag, account_data):
+        if account_data is None:
+            self.accounts.set(self.riot_id_key(gamename, tag), NOT_FOUND, self.negative_ttl)
+        else:
+            self.accounts.set(self.riot_id_key(gamename, tag), account_data, self.account_ttl)
+
+    def get_summoner(self, platform, puuid):
+        return self.summoners.get((platform, puuid))
+
+    def set_summoner(self, platform, puuid, summoner_data):
+        if summoner_data is None:
+            self.summoners.set((platform, puuid), NOT_FOUND, self.negative_ttl)
+            return
+        self.summoners.set((platform, puuid), summoner_data, self.summoner_ttl)
+
+    def get_summoner_id(self, platform, puuid):
+        return self.summoner_ids.get((platform, puuid))
+
+    def set_summoner_id(self, platform, puuid, summoner_id):
+        self.summoner_ids.set((platform, puuid), summoner_id, self.summoner_id_ttl)
+
+    def get_platform(self, puuid):
+        return self.platforms.get(puuid)
+
+    def set_platform(self, puuid, platform):
+        if platform is None:
+            self.platforms.set(puuid, NOT_FOUND, self.negative_ttl)
+        else:
+            self.platforms.set(puuid, platform, self.account_ttl)
@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+
+from identity_cache import ACCOUNT_TTL, MISSING, NEGATIVE_TTL, NOT_FOUND, TTLCache
+from rate_limiter import BACKGROUND
+from telemetry import log_event
+
+QUEUE = 'RANKED_SOLO_5x5'
+# Seconds between refreshes of the apex leagues
+REFRESH_INTERVAL = int(os.getenv('LEADERBOARD_REFRESH', '600'))
+# Apex tiers, best first, with their league-v4 endpoint
+TIERS = (
+    ('CHALLENGER', 'challengerleagues'),
+    ('GRANDMASTER', 'grandmasterleagues'),
+    ('MASTER', 'masterleagues'),
+)
+MAX_PAGE_SIZE = 100
+# Riot ID lookups per refresh, best ranked first; the rest are resolved by later refreshes
+NAME_LOOKUPS = int(os.getenv('LEADERBOARD_NAME_LOOKUPS', '200'))
+
+
+class LeaderboardIndex:
+    """Immutable, LP-sorted snapshot of the apex ladder; pages are plain slices"""
+
+    def __init__(self, entries, updated_at):
+        self.entries = entries
+        self.updated_at = updated_at
+        self._tiers = {}
+        for entry in entries:
+            self._tiers.setdefault(entry['tier'], []).append(entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def select(self, tier=None):
+        return self.entries if tier is None else self._tiers.get(tier, [])
+
+    def page(self, page, per_page, tier=None):
+        entries = self.select(tier)
+        start = (page - 1) * per_page
+        return entries[start:start + per_page], len(entries)
+
+
+def build_entries(tier_entries):
+    """Sort raw league entries by tier, then LP, then wins, and number them"""
+    order = {tier: index for index, (tier, _) in enumerate(TIERS)}
+    rows = []
+    for tier, entries in tier_entries.items():
+        for entry in entries:
+            wins = entry.get('wins', 0)
+            losses = entry.get('losses', 0)
+            rows.append({
+                'tier': tier,
+                'puuid': entry.get('puuid', ''),
+                'riotId': None,
+                'summonerId': entry.get('summonerId', ''),
+                'leaguePoints': entry.get('leaguePoints', 0),
+                'wins': wins,
+                'losses': losses,
+                'winRate': round(100 * wins / (wins + losses), 1) if wins + losses else 0.0,
+                'hotStreak': entry.get('hotStreak', False),
+                'veteran': entry.get('veteran', False),
+            })
+    rows.sort(key=lambda row: (order[row['tier']], -row['leaguePoints'], -row['wins']))
+    for position, row in enumerate(rows, 1):
+        row['position'] = position
+    return rows
+
+
+class Leaderboard:
+    """Keeps the apex-tier ladder in memory, refreshed by a background thread.
+
+    Requests only ever read the current LeaderboardIndex; Riot is called by
+    the refresher alone, in the rate limiter's background lane. A tier that
+    fails to refresh keeps its previous entries. Riot IDs are looked up
+    through account-v1 after each refresh, at most ``name_lookups`` per
+    refresh, and cached for ACCOUNT_TTL.
+    """
+
+    def __init__(self, riot, platform_url, account_url, queue=QUEUE, interval=REFRESH_INTERVAL,
+                 name_lookups=NAME_LOOKUPS):
+        self.riot = riot
+        self.platform_url = platform_url
+        self.account_url = account_url
+        self.queue = queue
+        self.interval = interval
+        self.name_lookups = name_lookups
+        self.index = LeaderboardIndex([], None)
+        # puuid -> "gameName#tagLine", or NOT_FOUND
+        self.names = TTLCache(max_entries=50000)
+        self._tier_entries = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def refresh(self):
+        for tier, endpoint in TIERS:
+            try:
+                response = self.riot.get(
+                    f"{self.platform_url}/lol/league/v4/{endpoint}/by-queue/{self.queue}",
+                    priority=BACKGROUND
+                )
+                if response.status_code == 200:
+                    self._tier_entries[tier] = response.json().get('entries', [])
+                else:
+                    log_event('leaderboard_refresh_failed', level=logging.WARNING, tier=tier,
+                              status=response.status_code)
+            except Exception as e:
+                log_event('leaderboard_refresh_failed', level=logging.WARNING, tier=tier, error=str(e))
+        # Swapped in one assignment, so readers never see a half-built index
+        entries = build_entries(self._tier_entries)
+        self.index = LeaderboardIndex(self._with_names(entries), time.time())
+        if self._resolve_names(entries):
+            self.index = LeaderboardIndex(self._with_names(entries), self.index.updated_at)
+        return self.index
+
+    def _with_names(self, entries):
+        """Copies of ``entries`` with the cached Riot IDs filled in"""
+        named = []
+        for entry in entries:
+            name = self.names.get(entry['puuid'])
+            named.append(dict(entry, riotId=name) if isinstance(name, str) else entry)
+        return named
+
+    def _resolve_names(self, entries):
+        """Look up uncached Riot IDs, best ranked first; returns how many were found"""
+        resolved = lookups = 0
+        for entry in entries:
+            if lookups >= self.name_lookups:
+                break
+            puuid = entry['puuid']
+            if not puuid or self.names.get(puuid) is not MISSING:
+                continue
+            lookups += 1
+            try:
+                response = self.riot.get(f"{self.account_url}/riot/account/v1/accounts/by-puuid/{puuid}",
+                                         priority=BACKGROUND)
+            except Exception as e:
+                log_event('leaderboard_names_failed', level=logging.WARNING, error=str(e))
+                break
+            if response.status_code == 200:
+                account = response.json()
+                self.names.set(puuid, f"{account.get('gameName')}#{account.get('tagLine')}", ACCOUNT_TTL)
+                resolved += 1
+            elif response.status_code == 404:
+                self.names.set(puuid, NOT_FOUND, NEGATIVE_TTL)
+            else:
+                log_event('leaderboard_names_failed', level=logging.WARNING, status=response.status_code)
+                break
+        return resolved
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None and self.interval > 0:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='leaderboard')
+                self._thread.start()
+
+    def current(self):
+        """The latest index; the refresher is started on first use"""
+        self.start()
+        return self.index
+
+    def stop(self):
+        self._stop.set()
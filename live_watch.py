@@ -0,0 +1,268 @@
+import logging
+import os
+import queue
+import threading
+
+from rate_limiter import RateLimitExceeded
+from telemetry import log_event
+
+# Seconds between spectator polls of a watched game
+POLL_INTERVAL = int(os.getenv('LIVE_GAME_POLL_INTERVAL', '30'))
+# Idle seconds between SSE keep-alive comments
+HEARTBEAT = 15
+# Events buffered per subscriber before a slow client is dropped
+SUBSCRIBER_BUFFER = 100
+# Longest wait between polls while the spectator lookup keeps failing
+MAX_BACKOFF = 300
+
+
+def state_delta(old, new):
+    """Top-level keys of ``new`` whose values differ from ``old``"""
+    return {key: value for key, value in new.items() if old.get(key) != value}
+
+
+class Subscription:
+    """One client's event queue on a Watch"""
+
+    def __init__(self, watch):
+        self.watch = watch
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        self.closed = False
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def events(self, heartbeat=HEARTBEAT):
+        """Yield ``(event, data)`` pairs, or None after ``heartbeat`` idle seconds, until the watch ends"""
+        while True:
+            try:
+                item = self.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                if self.closed:
+                    return
+                yield None
+                continue
+            if item is None:
+                return
+            yield item
+
+    def close(self):
+        self.watch.unsubscribe(self)
+
+
+class Watch:
+    """Polls one player's live game and fans the enriched state out to subscribers.
+
+    Subscribers get the full state when they join and then only the keys
+    that changed on each poll. When the game ends an ``ended`` event
+    carries the finished match ID. The watch stops once the game is over
+    or the last subscriber has left. Failed polls publish ``watch-error``
+    (``error`` is reserved by EventSource) and are retried with backoff.
+
+    Once a poll reveals the game, ``on_game(watch, match_id)`` may return
+    another watch already polling it; the subscribers move there and this
+    watch stops.
+    """
+
+    def __init__(self, riot_id, region, load, interval, on_stop, on_game):
+        self.riot_id = riot_id
+        self.region = region
+        self.key = (riot_id.casefold(), region)
+        self.load = load
+        self.interval = interval
+        self.on_stop = on_stop
+        self.on_game = on_game
+        self.match_id = None
+        self.state = None
+        self.stopped = False
+        self.failures = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"live-watch:{riot_id}")
+
+    def start(self):
+        self._thread.start()
+
+    def subscribe(self):
+        """New Subscription, primed with the current state; None if the watch already stopped"""
+        with self._lock:
+            if self.stopped:
+                return None
+            subscription = Subscription(self)
+            if self.state is not None:
+                subscription.put(('state', self.state))
+            self._subscribers.add(subscription)
+            return subscription
+
+    def adopt(self, subscriptions):
+        """Take over another watch's subscribers; False if this watch already stopped"""
+        with self._lock:
+            if self.stopped:
+                return False
+            for subscription in subscriptions:
+                subscription.watch = self
+                if self.state is not None:
+                    subscription.put(('state', self.state))
+                self._subscribers.add(subscription)
+            return True
+
+    def _hand_over(self, target):
+        with self._lock:
+            self.stopped = True
+            subscribers, self._subscribers = self._subscribers, set()
+        if not target.adopt(subscribers):
+            # The other watch just ended; clients reconnect and start a new one
+            for subscription in subscribers:
+                subscription.closed = True
+                subscription.put(None)
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            if not self._subscribers:
+                # Let the poller notice right away instead of after a full interval
+                self._wake.set()
+
+    def _publish(self, event, data):
+        with self._lock:
+            for subscription in list(self._subscribers):
+                if not subscription.put((event, data)):
+                    # Too far behind; the client reconnects and gets a fresh state
+                    self._subscribers.discard(subscription)
+                    subscription.closed = True
+
+    def _stop(self):
+        with self._lock:
+            self.stopped = True
+            subscribers, self._subscribers = self._subscribers, set()
+        for subscription in subscribers:
+            subscription.closed = True
+            subscription.put(None)
+        self.on_stop(self)
+
+    def _failed(self, error):
+        self.failures += 1
+        log_event('live_watch_error', level=logging.WARNING, riot_id=self.riot_id, error=error,
+                  failures=self.failures)
+        self._publish('watch-error', {'error': error})
+        return True
+
+    def _delay(self):
+        if not self.failures:
+            return self.interval
+        return min(MAX_BACKOFF, self.interval * 2 ** (self.failures - 1))
+
+    def _poll(self):
+        """Returns False once there is nothing more to watch"""
+        try:
+            status, state = self.load(self.riot_id, self.region)
+        except RateLimitExceeded as e:
+            self._wake.wait(e.retry_after)
+            return True
+        except Exception as e:
+            return self._failed(str(e))
+
+        if status != 200:
+            if self.state is None and status in (400, 404):
+                # Unknown Riot ID or summoner: nothing to watch
+                self._publish('state', state)
+                return False
+            # Upstream trouble mid-game is not the end of the game
+            return self._failed(state.get('error', f"HTTP {status}"))
+        self.failures = 0
+
+        if state.get('inGame') is not True:
+            if self.state is not None:
+                self._publish('ended', {'matchId': self.state.get('matchId')})
+            else:
+                self._publish('state', state)
+            return False
+
+        with self._lock:
+            previous, self.state = self.state, state
+        if previous is None or previous.get('matchId') != state.get('matchId'):
+            target = self.on_game(self, state.get('matchId'))
+            if target is not None:
+                self._hand_over(target)
+                return False
+            self._publish('state', state)
+        else:
+            delta = state_delta(previous, state)
+            if delta:
+                self._publish('update', delta)
+        return True
+
+    def _run(self):
+        try:
+            while self._poll():
+                self._wake.wait(self._delay())
+                self._wake.clear()
+                with self._lock:
+                    if not self._subscribers:
+                        return
+        finally:
+            self._stop()
+
+
+class LiveGameWatcher:
+    """One Watch per active game, shared by every viewer of any of its players.
+
+    A new Riot ID gets its own watch until the first poll names the game;
+    if another watch already polls that game the viewers move over and the
+    Riot ID is routed there, so polling cost scales with games rather than
+    with watched players.
+    """
+
+    def __init__(self, load, interval=POLL_INTERVAL):
+        self.load = load
+        self.interval = interval
+        # (casefolded Riot ID, region) -> Watch; several IDs may share one watch
+        self._watches = {}
+        # match ID -> the Watch polling it
+        self._games = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, riot_id, region=None):
+        key = (riot_id.casefold(), region)
+        while True:
+            with self._lock:
+                watch = self._watches.get(key)
+                created = watch is None
+                if created:
+                    watch = self._watches[key] = Watch(riot_id, region, self.load, self.interval, self._remove,
+                                                       self._found_game)
+            subscription = watch.subscribe()
+            if created:
+                # Started after the first subscriber joined so it sees the first poll
+                watch.start()
+            if subscription is not None:
+                return subscription
+            # Raced with a watch that was just stopping; start a fresh one
+            self._remove(watch)
+
+    def _found_game(self, watch, match_id):
+        """Watch already polling ``match_id`` for ``watch`` to hand over to, or None"""
+        with self._lock:
+            if self._games.get(watch.match_id) is watch:
+                del self._games[watch.match_id]
+            watch.match_id = match_id
+            if match_id is None:
+                return None
+            target = self._games.get(match_id)
+            if target is None or target.stopped:
+                self._games[match_id] = watch
+                return None
+            self._watches[watch.key] = target
+            return target
+
+    def _remove(self, watch):
+        with self._lock:
+            for key in [key for key, value in self._watches.items() if value is watch]:
+                del self._watches[key]
+            if self._games.get(watch.match_id) is watch:
+                del self._games[watch.match_id]
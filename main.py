@@ -1,18 +1,230 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 import requests
+import json
+import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from urllib.parse import quote
+
+from ai_jobs import AnalysisJobs
+from champion_stats import ChampionStats
+from http_cache import ResponseCache, compress_response
+from identity_cache import MISSING, NOT_FOUND, IdentityCache, TTLCache
+from leaderboard import MAX_PAGE_SIZE, TIERS, Leaderboard
+from live_watch import LiveGameWatcher
+from match_store import MatchStore
+from player_stats import StatsEngine
+from rate_limiter import RateLimitExceeded
+from regions import DEFAULT_PLATFORM, REGIONS, UnknownRegion, get_region, platform_for, region_for_match
+from riot_client import RiotClient
+from single_flight import SingleFlight
+from spectator_routing import SpectatorRouter
+from static_data import StaticData
+from telemetry import Metrics, configure_logging, log_event
+import win_model
 
 app = Flask(__name__)
 
+# Upstream latency, cache and per-route timing metrics, exposed on /metrics
+configure_logging()
+metrics = Metrics()
+metrics.describe('http_request_duration_seconds', 'Time spent handling each route')
+metrics.describe('upstream_request_duration_seconds', 'Latency of upstream API calls per endpoint')
+metrics.describe('upstream_responses_total', 'Upstream responses by endpoint and status code')
+metrics.describe('upstream_throttled_total', 'Requests rejected by the local Riot rate limiter')
+metrics.describe('cache_requests_total', 'Cache lookups by cache and result')
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_timing(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - started,
+                        route=route, method=request.method, status=response.status_code)
+    return response
+
+# Rendered JSON cached briefly per route and Riot ID, served with ETags and compression
+response_cache = ResponseCache(metrics=metrics)
+app.after_request(compress_response)
+
 # Riot Games API configuration
 RIOT_API_KEY = os.getenv('RIOT_API_KEY', 'your-riot-api-key-here')
 OPENROUTE_API_KEY = os.getenv('OPENROUTE_API_KEY', 'your-openroute-api-key-here')
-OPENROUTE_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTE_API_URL = os.getenv('OPENROUTE_API_URL', "https://openrouter.ai/api/v1/chat/completions")
+# Upper bound (seconds) for a single OpenRouter completion
+OPENROUTE_TIMEOUT = float(os.getenv('OPENROUTE_TIMEOUT', '60'))
+
+# Shared client used by every route for Riot API calls; each platform and
+# regional cluster host (see regions.py) gets its own pool and rate limiter
+riot = RiotClient(RIOT_API_KEY, metrics=metrics)
+
+# Keep-alive session for OpenRouter completions
+openrouter = requests.Session()
 
-# Riot API endpoints
-RIOT_BASE_URL = "https://euw1.api.riotgames.com"
-EUROPE_BASE_URL = "https://europe.api.riotgames.com"
+def openrouter_post(headers, payload, stream=False):
+    """POST a chat completion, recording its latency (time to headers when streaming)"""
+    endpoint = 'chat/completions:stream' if stream else 'chat/completions'
+    started = time.perf_counter()
+    try:
+        response = openrouter.post(OPENROUTE_API_URL, headers=headers, json=payload,
+                                   timeout=OPENROUTE_TIMEOUT, stream=stream)
+    except requests.RequestException:
+        metrics.upstream('openrouter', endpoint, 'error', time.perf_counter() - started)
+        raise
+    metrics.upstream('openrouter', endpoint, response.status_code, time.perf_counter() - started)
+    return response
+
+# Bounded worker pool for fanning out independent upstream calls
+UPSTREAM_WORKERS = int(os.getenv('UPSTREAM_WORKERS', '16'))
+upstream_pool = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix='upstream')
+
+# Overall deadline (seconds) for the live-game participant rank lookups
+RANK_LOOKUP_TIMEOUT = float(os.getenv('RANK_LOOKUP_TIMEOUT', '5'))
+
+# Concurrent requests for the same logical lookup share one fetch
+lookups = SingleFlight()
+
+# Finished matches never change, so they are only downloaded once
+match_store = MatchStore()
+
+def get_match(match_id):
+    """Return the MatchRecord for a match from the local store, fetching it from Riot on a miss"""
+    record = match_store.get(match_id)
+    metrics.cache('match_store', record is not None)
+    if record is not None:
+        return record
+    return lookups.do(('match', match_id), load_match, match_id)
+
+def load_match(match_id):
+    match_response = riot.get(f"{region_for_match(match_id).regional_url}/lol/match/v5/matches/{match_id}")
+    if match_response.status_code != 200:
+        return None
+    return match_store.put(match_id, match_response.json())
+
+# Champion, summoner spell and profile icon tables from the local Data Dragon
+# snapshot; start_background_tasks() downloads one when none is installed
+static_data = StaticData()
+static_data.load()
+
+# Incremental per-player aggregates over the stored matches
+stats_engine = StatsEngine(match_store)
+
+# Per-champion aggregates over every stored match, built in the background
+champion_stats = ChampionStats(match_store)
+
+def match_summary(record, participant, assets):
+    """Profile/match-history entry for one player's view of a match"""
+    return {
+        'matchId': record.match_id,
+        'champion': participant.champion_name,
+        'championIcon': assets.cdn_url('champion', f"{participant.champion_name}.png"),
+        'result': 'Victory' if participant.win else 'Defeat',
+        'kda': f"{participant.kills}/{participant.deaths}/{participant.assists}",
+        'duration': f"{record.game_duration//60}:{record.game_duration%60:02d}",
+        'gameMode': record.game_mode,
+        'queueId': record.queue_id,
+        'gameEndTimestamp': record.game_end_timestamp
+    }
+
+# Riot ID -> account -> summoner lookups shared by every route
+identity_cache = IdentityCache()
+
+def fetch_account(gamename, tag):
+    """Resolve a Riot ID to its account. Returns (status_code, account_data)"""
+    account_data = identity_cache.get_account(gamename, tag)
+    metrics.cache('account', account_data is not MISSING)
+    if account_data is NOT_FOUND:
+        return 404, None
+    if account_data is not MISSING:
+        return 200, account_data
+    return lookups.do(('account', identity_cache.riot_id_key(gamename, tag)), load_account, gamename, tag)
+
+def load_account(gamename, tag):
+    # URL encode the gamename and tag to handle special characters
+    encoded_gamename = quote(gamename, safe='')
+    encoded_tag = quote(tag, safe='')
+    # Accounts are global, so any cluster answers
+    account_url = f"{get_region().account_url}/riot/account/v1/accounts/by-riot-id/{encoded_gamename}/{encoded_tag}"
+    account_response = riot.get(account_url)
+    if account_response.status_code == 200:
+        account_data = account_response.json()
+        identity_cache.set_account(gamename, tag, account_data)
+        return 200, account_data
+    if account_response.status_code == 404:
+        identity_cache.set_account(gamename, tag, None)
+    return account_response.status_code, None
+
+def fetch_summoner(region, puuid):
+    """Get the summoner for a PUUID on a platform. Returns (status_code, summoner_data)"""
+    summoner_data = identity_cache.get_summoner(region.platform, puuid)
+    metrics.cache('summoner', summoner_data is not MISSING)
+    if summoner_data is NOT_FOUND:
+        return 404, None
+    if summoner_data is not MISSING:
+        return 200, summoner_data
+    return lookups.do(('summoner', region.platform, puuid), load_summoner, region, puuid)
+
+def load_summoner(region, puuid):
+    summoner_response = riot.get(f"{region.platform_url}/lol/summoner/v4/summoners/by-puuid/{puuid}")
+    if summoner_response.status_code == 200:
+        summoner_data = summoner_response.json()
+        identity_cache.set_summoner(region.platform, puuid, summoner_data)
+        summoner_id = extract_summoner_id(summoner_data)
+        if summoner_id:
+            identity_cache.set_summoner_id(region.platform, puuid, summoner_id)
+        return 200, summoner_data
+    if summoner_response.status_code == 404:
+        identity_cache.set_summoner(region.platform, puuid, None)
+    return summoner_response.status_code, None
+
+def resolve_region(puuid, tag, requested=None):
+    """Region to query for a player.
+
+    An explicitly requested region wins; otherwise the platform Riot
+    reported the account as active on, when already known. Default tags
+    name the platform (``#EUNE``, ``#NA1``), so for most players that saves
+    the active-region call; the others are looked up once and cached.
+    """
+    if requested is not None:
+        return requested
+    platform = identity_cache.get_platform(puuid)
+    if platform is MISSING:
+        platform = platform_for(tag) or lookups.do(('platform', puuid), load_platform, puuid)
+    return get_region(None if platform is NOT_FOUND else platform)
+
+def relocated_region(puuid, region):
+    """Active region of a player with no summoner on ``region`` (their tag names a platform they left)"""
+    platform = identity_cache.get_platform(puuid)
+    if platform is MISSING:
+        platform = lookups.do(('platform', puuid), load_platform, puuid)
+    if platform is NOT_FOUND or platform is None or platform == region.platform:
+        return None
+    return get_region(platform)
+
+def load_platform(puuid):
+    response = riot.get(f"{get_region().account_url}/riot/account/v1/region/by-game/lol/by-puuid/{puuid}")
+    platform = platform_for(response.json().get('region')) if response.status_code == 200 else None
+    # Keys without access to this endpoint get 403; the tag or default is used until the entry expires
+    identity_cache.set_platform(puuid, platform)
+    return platform
+
+def region_param(name):
+    """Region named by a ?region= parameter, None when absent. Raises UnknownRegion"""
+    return get_region(name) if name else None
+
+def extract_summoner_id(summoner_data):
+    # Newer accounts may expose the summoner ID under a different field
+    return summoner_data.get('id') or summoner_data.get('accountId') or summoner_data.get('summonerId')
+
+def rate_limited_response(error):
+    """503 with Retry-After for requests that could not get Riot API budget in time"""
+    retry_after = max(1, int(error.retry_after + 0.999))
+    return jsonify({'error': 'Too many requests to Riot API, try again shortly'}), 503, {'Retry-After': str(retry_after)}
 
 @app.route('/')
 def index():
@@ -20,130 +232,205 @@ def index():
 
 @app.route('/summoner/<path:riot_id>')
 def summoner_profile(riot_id):
-    return render_template('summoner.html', riot_id=riot_id)
+    return render_template('summoner.html', riot_id=riot_id, region=request.args.get('region', ''))
 
 @app.route('/live-game/<path:riot_id>')
 def live_game_view(riot_id):
-    return render_template('live-game.html', riot_id=riot_id)
+    return render_template('live-game.html', riot_id=riot_id, region=request.args.get('region', ''))
 
 @app.route('/api/summoner/<path:riot_id>')
+@response_cache.cached(ttl=60, cache_control='public, max-age=60')
 def get_summoner_data(riot_id):
     try:
-        # Parse gamename and tag from riot_id (format: gamename#tag)
+        status, body = load_profile(riot_id, region_param(request.args.get('region')))
+        return jsonify(body), status
+    except UnknownRegion as e:
+        return jsonify({'error': str(e)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        log_event('route_error', level=logging.ERROR, route='get_summoner_data', error=str(e),
+                  riot_api_key_configured=RIOT_API_KEY != 'your-riot-api-key-here')
+        return jsonify({'error': str(e)}), 500
+
+def load_profile(riot_id, region=None):
+    """(status, body) for a player's profile: account, rank, recent matches and aggregates"""
+    # Parse gamename and tag from riot_id (format: gamename#tag)
+    if '#' not in riot_id:
+        return 400, {'error': 'Invalid Riot ID format. Use gamename#tag'}
+
+    gamename, tag = riot_id.split('#', 1)
+
+    # Get account by Riot ID (gamename + tag)
+    account_status, account_data = fetch_account(gamename, tag)
+    if account_status != 200:
+        if account_status == 404:
+            return 404, {'error': 'Account not found'}
+        return 500, {'error': f'API Error: {account_status}'}
+
+    puuid = account_data['puuid']
+    requested = region
+    region = resolve_region(puuid, tag, requested)
+
+    # Aggregates start from whatever is already stored and pick up the
+    # matches fetched below as they land in the match store
+    stats_engine.track(puuid)
+
+    # Summoner and match-id lookups only need the PUUID, so run them together
+    matches_url = f"{region.regional_url}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count=10"
+    summoner_future = upstream_pool.submit(fetch_summoner, region, puuid)
+    matches_future = upstream_pool.submit(riot.get, matches_url)
+
+    summoner_status, summoner_data = summoner_future.result()
+    if summoner_status != 200:
+        relocated = relocated_region(puuid, region) if summoner_status == 404 and requested is None else None
+        if relocated:
+            return load_profile(riot_id, relocated)
+        return 404, {'error': f'Summoner API error: {summoner_status}'}
+
+    # Modern API uses puuid for ranked data
+    summoner_id = extract_summoner_id(summoner_data)
+
+    # For newer Riot API, some accounts might not have a summoner ID
+    # This is normal for accounts that haven't played ranked LoL
+
+    # Get ranked info - try with summoner ID first, then puuid
+    ranked_future = None
+    if summoner_id:
+        ranked_url = f"{region.platform_url}/lol/league/v4/entries/by-summoner/{summoner_id}"
+        ranked_future = upstream_pool.submit(riot.get, ranked_url)
+    # For accounts without summoner ID, ranked data is skipped for now
+
+    # Get recent matches - details for the first 5 are fetched concurrently
+    matches_response = matches_future.result()
+    match_ids = matches_response.json() if matches_response.status_code == 200 else []
+    matches = list(upstream_pool.map(get_match, match_ids[:5]))
+
+    if ranked_future:
+        ranked_response = ranked_future.result()
+        ranked_data = ranked_response.json() if ranked_response.status_code == 200 else []
+    else:
+        ranked_data = []
+
+    assets = static_data.index
+    recent_matches = []
+    for record in matches:
+        if record:
+            # Find participant data
+            participant = record.participant(puuid)
+            if participant:
+                recent_matches.append(match_summary(record, participant, assets))
+
+    result_data = {
+        'summoner': {
+            'gameName': account_data['gameName'],
+            'tagLine': account_data['tagLine'],
+            'riotId': riot_id,
+            'level': summoner_data['summonerLevel'],
+            'profileIconId': summoner_data['profileIconId'],
+            'profileIconUrl': assets.profile_icon(summoner_data['profileIconId']),
+            'puuid': puuid
+        },
+        'region': region.platform,
+        'ranked': solo_queue_rank(ranked_data),
+        'recentMatches': recent_matches,
+        'stats': stats_engine.snapshot(puuid),
+        'ddragonVersion': assets.version
+    }
+
+    return 200, result_data
+
+# Largest number of Riot IDs accepted by one batch profile request
+MAX_BATCH_PROFILES = int(os.getenv('MAX_BATCH_PROFILES', '50'))
+# Whole profiles run here, separate from upstream_pool: each one waits on
+# calls submitted to upstream_pool, so sharing it could starve the pool
+profile_pool = ThreadPoolExecutor(max_workers=UPSTREAM_WORKERS, thread_name_prefix='profile')
+
+@app.route('/api/summoner/batch', methods=['POST'])
+def get_summoner_batch():
+    """Profiles for many players as NDJSON, one line per Riot ID in completion order.
+
+    Body: {"riotIds": [...], "region": optional platform for all of them}
+    """
+    data = request.get_json(silent=True) or {}
+    riot_ids = data.get('riotIds')
+    if not isinstance(riot_ids, list) or not all(isinstance(riot_id, str) for riot_id in riot_ids):
+        return jsonify({'error': 'riotIds must be a list of Riot IDs'}), 400
+    try:
+        region = region_param(data.get('region'))
+    except UnknownRegion as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Riot IDs are case-insensitive; each player is loaded once however often it is listed
+    unique = {}
+    for riot_id in riot_ids:
+        unique.setdefault(riot_id.strip().casefold(), riot_id.strip())
+    if len(unique) > MAX_BATCH_PROFILES:
+        return jsonify({'error': f'At most {MAX_BATCH_PROFILES} Riot IDs per request'}), 400
+
+    # Shared matches are fetched once: get_match coalesces concurrent
+    # downloads and the match store serves them to the later profiles
+    futures = {
+        profile_pool.submit(lookups.do, ('profile', key, region), load_profile, riot_id, region): riot_id
+        for key, riot_id in unique.items()
+    }
+
+    def lines():
+        for future in as_completed(futures):
+            riot_id = futures[future]
+            try:
+                status, body = future.result()
+            except RateLimitExceeded as e:
+                status, body = 503, {'error': 'Too many requests to Riot API, try again shortly',
+                                     'retryAfter': max(1, int(e.retry_after + 0.999))}
+            except Exception as e:
+                log_event('route_error', level=logging.ERROR, route='get_summoner_batch', error=str(e))
+                status, body = 500, {'error': str(e)}
+            yield json.dumps({'riotId': riot_id, 'status': status, 'data': body}, ensure_ascii=False) + '\n'
+
+    return Response(lines(), mimetype='application/x-ndjson', headers={'Cache-Control': 'no-store'})
+
+@app.route('/api/summoner/<path:riot_id>/matches')
+@response_cache.cached(ttl=60, cache_control='public, max-age=60')
+def get_match_history(riot_id):
+    """Paginated match history and aggregates, served from the local match store"""
+    try:
         if '#' not in riot_id:
             return jsonify({'error': 'Invalid Riot ID format. Use gamename#tag'}), 400
 
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
         gamename, tag = riot_id.split('#', 1)
-        
-        # URL encode the gamename and tag to handle special characters
-        from urllib.parse import quote
-        encoded_gamename = quote(gamename, safe='')
-        encoded_tag = quote(tag, safe='')
-
-        # Get account info using Riot ID (gamename + tag)
-        account_url = f"{EUROPE_BASE_URL}/riot/account/v1/accounts/by-riot-id/{encoded_gamename}/{encoded_tag}"
-        headers = {'X-Riot-Token': RIOT_API_KEY}
-        
-        print(f"Account URL: {account_url}")
-
-        # Get account by Riot ID
-        account_response = requests.get(account_url, headers=headers)
-        print(f"Account API Status: {account_response.status_code}")
-        print(f"Account API Response: {account_response.text}")
-        if account_response.status_code != 200:
-            if account_response.status_code == 404:
+        account_status, account_data = fetch_account(gamename, tag)
+        if account_status != 200:
+            if account_status == 404:
                 return jsonify({'error': 'Account not found'}), 404
-            return jsonify({'error': f'API Error: {account_response.status_code}'}), 500
+            return jsonify({'error': f'API Error: {account_status}'}), 500
 
-        account_data = account_response.json()
         puuid = account_data['puuid']
+        assets = static_data.index
+        matches = []
+        for match_id in match_store.player_match_ids(puuid, start=(page - 1) * per_page, count=per_page):
+            record = match_store.get(match_id)
+            participant = record.participant(puuid) if record else None
+            if participant:
+                matches.append(match_summary(record, participant, assets))
 
-        # Get summoner info by PUUID
-        summoner_url = f"{RIOT_BASE_URL}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        summoner_response = requests.get(summoner_url, headers=headers)
-        
-        print(f"Summoner API Status: {summoner_response.status_code}")
-        print(f"Summoner API Response: {summoner_response.text}")
-        
-        if summoner_response.status_code != 200:
-            return jsonify({'error': f'Summoner API error: {summoner_response.status_code}'}), 404
-
-        summoner_data = summoner_response.json()
-        
-        # Modern API uses puuid for ranked data
-        summoner_id = summoner_data.get('id')
-        
-        # If no summoner ID, try to get it from different field names
-        if not summoner_id:
-            summoner_id = summoner_data.get('accountId') or summoner_data.get('summonerId')
-            print(f"No standard 'id' found, trying alternative fields: {summoner_id}")
-            print(f"Available fields in summoner data: {list(summoner_data.keys())}")
-            
-        # For newer Riot API, some accounts might not have a summoner ID
-        # This is normal for accounts that haven't played ranked LoL
-        if not summoner_id:
-            print(f"No summoner ID found for account, this is normal for new accounts")
-        
-        # Get ranked info - try with summoner ID first, then puuid
-        if summoner_id:
-            ranked_url = f"{RIOT_BASE_URL}/lol/league/v4/entries/by-summoner/{summoner_id}"
-            ranked_response = requests.get(ranked_url, headers=headers)
-            ranked_data = ranked_response.json() if ranked_response.status_code == 200 else []
-            print(f"Ranked API Status: {ranked_response.status_code}")
-        else:
-            # For accounts without summoner ID, skip ranked data for now
-            ranked_data = []
-            print("Skipping ranked data - no summoner ID available")
-
-        # Find Solo/Duo queue data
-        solo_queue = next((entry for entry in ranked_data if entry['queueType'] == 'RANKED_SOLO_5x5'), None)
-
-        # Get recent matches
-        matches_url = f"{EUROPE_BASE_URL}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count=10"
-        matches_response = requests.get(matches_url, headers=headers)
-        match_ids = matches_response.json() if matches_response.status_code == 200 else []
-
-        recent_matches = []
-        for match_id in match_ids[:5]:  # Get details for first 5 matches
-            match_url = f"{EUROPE_BASE_URL}/lol/match/v5/matches/{match_id}"
-            match_response = requests.get(match_url, headers=headers)
-            if match_response.status_code == 200:
-                match_data = match_response.json()
-                # Find participant data
-                participant = next((p for p in match_data['info']['participants'] if p['puuid'] == puuid), None)
-                if participant:
-                    recent_matches.append({
-                        'champion': participant['championName'],
-                        'result': 'Victory' if participant['win'] else 'Defeat',
-                        'kda': f"{participant['kills']}/{participant['deaths']}/{participant['assists']}",
-                        'duration': f"{match_data['info']['gameDuration']//60}:{match_data['info']['gameDuration']%60:02d}",
-                        'gameMode': match_data['info']['gameMode']
-                    })
-
-        result_data = {
-            'summoner': {
-                'gameName': account_data['gameName'],
-                'tagLine': account_data['tagLine'],
-                'riotId': riot_id,
-                'level': summoner_data['summonerLevel'],
-                'profileIconId': summoner_data['profileIconId'],
-                'puuid': puuid
-            },
-            'ranked': {
-                'tier': solo_queue['tier'] if solo_queue else 'UNRANKED',
-                'rank': solo_queue['rank'] if solo_queue else '',
-                'leaguePoints': solo_queue['leaguePoints'] if solo_queue else 0,
-                'wins': solo_queue['wins'] if solo_queue else 0,
-                'losses': solo_queue['losses'] if solo_queue else 0
-            },
-            'recentMatches': recent_matches
-        }
-
-        return jsonify(result_data)
+        return jsonify({
+            'riotId': riot_id,
+            'puuid': puuid,
+            'page': page,
+            'perPage': per_page,
+            'total': match_store.player_match_count(puuid),
+            'matches': matches,
+            'stats': stats_engine.snapshot(puuid)
+        })
 
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
     except Exception as e:
-        print(f"Error in get_summoner_data: {str(e)}")
-        print(f"RIOT_API_KEY configured: {'Yes' if RIOT_API_KEY != 'your-riot-api-key-here' else 'No'}")
+        log_event('route_error', level=logging.ERROR, route='get_match_history', error=str(e))
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/analyze-performance', methods=['POST'])
@@ -156,31 +443,156 @@ def analyze_performance():
         if not summoner_name:
             return jsonify({'error': 'No summoner name provided'}), 400
 
-        # AI analysis of player performance
-        analysis_result = analyze_player_with_ai(summoner_name, match_history)
+        # AI analysis of player performance - runs on the AI executor so slow
+        # completions can't pile up on request threads
+        job = analysis_jobs.submit(summoner_name, match_history)
+        metrics.cache('analysis', job.get('cached', False))
+        job = analysis_jobs.wait(job['id'], timeout=OPENROUTE_TIMEOUT)
+
+        if job['status'] in ('queued', 'running'):
+            # Still running - let the client poll the job instead of holding the worker
+            return jsonify({
+                'summoner_name': summoner_name,
+                'job_id': job['id'],
+                'status': job['status'],
+                'status_url': f"/api/analyze-performance/jobs/{job['id']}"
+            }), 202
+        if job['status'] == 'error':
+            return jsonify({'error': job['error']}), 500
 
         return jsonify({
             'summoner_name': summoner_name,
-            'analysis': analysis_result,
+            'analysis': job['analysis'],
             'status': 'success'
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def analyze_player_with_ai(summoner_name, match_history):
+@app.route('/api/analyze-performance/jobs', methods=['POST'])
+def create_analysis_job():
+    """Start an AI analysis in the background and return its job ID right away"""
+    try:
+        data = request.get_json()
+        summoner_name = data.get('summoner_name', '')
+        match_history = data.get('match_history', [])
+
+        if not summoner_name:
+            return jsonify({'error': 'No summoner name provided'}), 400
+
+        job = analysis_jobs.submit(summoner_name, match_history)
+        metrics.cache('analysis', job.get('cached', False))
+        job['status_url'] = f"/api/analyze-performance/jobs/{job['id']}"
+        return jsonify(job), 200 if job['status'] == 'done' else 202
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze-performance/jobs/<job_id>')
+def get_analysis_job(job_id):
+    # Optional long-poll: ?wait=N blocks up to N seconds for the job to finish
+    wait_seconds = min(request.args.get('wait', 0, type=float), 30)
+    job = analysis_jobs.wait(job_id, timeout=wait_seconds) if wait_seconds > 0 else analysis_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/analyze-performance/stream', methods=['POST'])
+def stream_analysis():
+    """Stream the AI analysis to the browser as Server-Sent Events"""
+    data = request.get_json() or {}
+    summoner_name = data.get('summoner_name', '')
+    match_history = data.get('match_history', [])
+
+    if not summoner_name:
+        return jsonify({'error': 'No summoner name provided'}), 400
+
+    return Response(
+        stream_with_context(stream_analysis_events(summoner_name, match_history)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def sse_event(data, event=None):
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def stream_analysis_events(summoner_name, match_history):
+    """Yield SSE messages with analysis text chunks as OpenRouter produces them"""
+    cached = analysis_jobs.cached(summoner_name, match_history)
+    metrics.cache('analysis', cached is not None)
+    if cached is not None:
+        yield sse_event({'delta': cached})
+        yield sse_event({'cached': True}, event='done')
+        return
+
+    if not OPENROUTE_API_KEY or OPENROUTE_API_KEY == 'your-openroute-api-key-here':
+        yield sse_event({'delta': demo_analysis(summoner_name)})
+        yield sse_event({}, event='done')
+        return
+
+    headers, payload = build_analysis_request(summoner_name, match_history)
+    payload['stream'] = True
+    chunks = []
+    try:
+        with openrouter_post(headers, payload, stream=True) as response:
+            if response.status_code != 200:
+                log_event('openrouter_status', level=logging.WARNING, status=response.status_code,
+                          body=response.text[:200])
+                yield sse_event({'error': f"Błąd API: {response.status_code}. Sprawdź klucz API."}, event='error')
+                return
+
+            for line in response.iter_lines(decode_unicode=True):
+                # OpenRouter also sends ": keep-alive" comments between chunks
+                if not line or not line.startswith('data:'):
+                    continue
+                chunk = line[len('data:'):].strip()
+                if chunk == '[DONE]':
+                    break
+                choices = json.loads(chunk).get('choices') or [{}]
+                delta = choices[0].get('delta', {}).get('content')
+                if delta:
+                    chunks.append(delta)
+                    yield sse_event({'delta': delta})
+    except Exception as e:
+        log_event('openrouter_error', level=logging.ERROR, stream=True, error=str(e))
+        yield sse_event({'error': f"Błąd analizy: {str(e)}"}, event='error')
+        return
+
+    if chunks:
+        analysis_jobs.store(summoner_name, match_history, ''.join(chunks))
+    yield sse_event({}, event='done')
+
+def generate_analysis(summoner_name, match_history):
     """
-    AI analysis of player performance using OpenRoute AI
+    Produce the analysis text. Returns (text, ok) where ok is False for
+    API errors and fallbacks that should not be cached
     """
     try:
         # Check if API key is configured
         if not OPENROUTE_API_KEY or OPENROUTE_API_KEY == 'your-openroute-api-key-here':
-            return f"""
+            return demo_analysis(summoner_name), True
+
+        headers, payload = build_analysis_request(summoner_name, match_history)
+
+        # Real AI analysis using Qwen model
+        try:
+            response = openrouter_post(headers, payload)
+            if response.status_code == 200:
+                return response.json()['choices'][0]['message']['content'], True
+            else:
+                log_event('openrouter_status', level=logging.WARNING, status=response.status_code,
+                          body=response.text[:200])
+                return f"Błąd API: {response.status_code}. Sprawdź klucz API.", False
+        except Exception as e:
+            log_event('openrouter_error', level=logging.ERROR, error=str(e))
+            # Fallback to mock analysis if API fails
+        return f"""
 🎯 **Analiza wydajności dla {summoner_name}**
 
 **Mocne strony:**
-• Dobra kontrola damage'u w ostatnich meczach
-• Solidny wybór championów 
+• Dobra kontrola damage'u - średnie KDA powyżej 2.0
+• Solidny wybór championów (ADC main)
 • Konsystentność w grze
 
 **Obszary do poprawy:**
@@ -194,57 +606,19 @@ def analyze_player_with_ai(summoner_name, match_history):
 3. Trenuj last-hitting w Practice Tool
 
 **Ogólna ocena:** 7.5/10 - Solidny gracz z potencjałem na awans!
+        """, False
 
-*Uwaga: Dla pełnej analizy AI skonfiguruj klucz API OpenRoute*
-            """
-
-        headers = {
-            'Authorization': f'Bearer {OPENROUTE_API_KEY}',
-            'Content-Type': 'application/json'
-        }
-
-        # Prepare match data for analysis
-        matches_text = "\n".join([
-            f"Champion: {match.get('champion', 'Unknown')}, "
-            f"Result: {match.get('result', 'Unknown')}, "
-            f"KDA: {match.get('kda', 'Unknown')}, "
-            f"Duration: {match.get('duration', 'Unknown')}"
-            for match in match_history
-        ])
-
-        payload = {
-            "model": "qwen/qwen-2.5-72b-instruct:free",
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "Jesteś profesjonalnym trenerem i analitykiem League of Legends. Analizuj wydajność gracza i podawaj konstruktywne opinie, mocne strony, słabości i sugestie poprawy. Odpowiadaj w języku polskim."
-                },
-                {
-                    "role": "user",
-                    "content": f"Przeanalizuj wydajność gracza '{summoner_name}' na podstawie jego ostatnich meczów:\n\n{matches_text}\n\nPodaj szczegółową analizę obejmującą mocne strony, słabości i konkretne rekomendacje poprawy."
-                }
-            ],
-            "max_tokens": 1500,
-            "temperature": 0.7
-        }
+    except Exception as e:
+        return f"Błąd analizy: {str(e)}", False
 
-        # Real AI analysis using Qwen model
-        try:
-            response = requests.post(OPENROUTE_API_URL, headers=headers, json=payload)
-            if response.status_code == 200:
-                return response.json()['choices'][0]['message']['content']
-            else:
-                print(f"API Error: {response.status_code}, {response.text}")
-                return f"Błąd API: {response.status_code}. Sprawdź klucz API."
-        except Exception as e:
-            print(f"Request error: {e}")
-            # Fallback to mock analysis if API fails
-        return f"""
+def demo_analysis(summoner_name):
+    """Placeholder analysis shown when no OpenRoute API key is configured"""
+    return f"""
 🎯 **Analiza wydajności dla {summoner_name}**
 
 **Mocne strony:**
-• Dobra kontrola damage'u - średnie KDA powyżej 2.0
-• Solidny wybór championów (ADC main)
+• Dobra kontrola damage'u w ostatnich meczach
+• Solidny wybór championów 
 • Konsystentność w grze
 
 **Obszary do poprawy:**
@@ -258,262 +632,416 @@ def analyze_player_with_ai(summoner_name, match_history):
 3. Trenuj last-hitting w Practice Tool
 
 **Ogólna ocena:** 7.5/10 - Solidny gracz z potencjałem na awans!
-        """
 
-    except Exception as e:
-        return f"Błąd analizy: {str(e)}"
+*Uwaga: Dla pełnej analizy AI skonfiguruj klucz API OpenRoute*
+            """
+
+def build_analysis_request(summoner_name, match_history):
+    """Build the OpenRouter headers and chat payload for a performance analysis"""
+    headers = {
+        'Authorization': f'Bearer {OPENROUTE_API_KEY}',
+        'Content-Type': 'application/json'
+    }
+
+    # Prepare match data for analysis
+    matches_text = "\n".join([
+        f"Champion: {match.get('champion', 'Unknown')}, "
+        f"Result: {match.get('result', 'Unknown')}, "
+        f"KDA: {match.get('kda', 'Unknown')}, "
+        f"Duration: {match.get('duration', 'Unknown')}"
+        for match in match_history
+    ])
+
+    # Aggregates over all stored matches, when we already know this player
+    stats_text = stats_summary_text(stored_stats_for(summoner_name))
+    if stats_text:
+        matches_text = f"{matches_text}\n\nStatystyki ze wszystkich zapisanych meczów:\n{stats_text}"
+
+    payload = {
+        "model": "qwen/qwen-2.5-72b-instruct:free",
+        "messages": [
+            {
+                "role": "system",
+                "content": "Jesteś profesjonalnym trenerem i analitykiem League of Legends. Analizuj wydajność gracza i podawaj konstruktywne opinie, mocne strony, słabości i sugestie poprawy. Odpowiadaj w języku polskim."
+            },
+            {
+                "role": "user",
+                "content": f"Przeanalizuj wydajność gracza '{summoner_name}' na podstawie jego ostatnich meczów:\n\n{matches_text}\n\nPodaj szczegółową analizę obejmującą mocne strony, słabości i konkretne rekomendacje poprawy."
+            }
+        ],
+        "max_tokens": 1500,
+        "temperature": 0.7
+    }
+    return headers, payload
+
+def stored_stats_for(riot_id):
+    """Aggregates for a Riot ID from local data only (no upstream calls), or None"""
+    if '#' not in riot_id:
+        return None
+    account_data = identity_cache.get_account(*riot_id.split('#', 1))
+    if account_data is MISSING or account_data is NOT_FOUND:
+        return None
+    stats = stats_engine.snapshot(account_data['puuid'])
+    return stats if stats['games'] else None
+
+def stats_summary_text(stats):
+    if not stats:
+        return ''
+    lines = [
+        f"Gry: {stats['games']}, winrate {stats['winRate']}%, średnie KDA "
+        f"{stats['kda']['kills']}/{stats['kda']['deaths']}/{stats['kda']['assists']} ({stats['kda']['ratio']})"
+    ]
+    for champion in stats['champions'][:5]:
+        lines.append(
+            f"{champion['champion']}: {champion['games']} gier, winrate {champion['winRate']}%, KDA {champion['kda']}"
+        )
+    for window, form in stats['recentForm'].items():
+        lines.append(f"Forma ({window}): {form['wins']}/{form['games']} wygranych")
+    for bucket in stats['durationBuckets']:
+        if bucket['games']:
+            lines.append(f"Mecze {bucket['bucket']} min: {bucket['games']} gier, winrate {bucket['winRate']}%")
+    return "\n".join(lines)
+
+# Background executor and result cache for AI analyses
+analysis_jobs = AnalysisJobs(generate_analysis)
+
+# Optional LLM explanations for live-game predictions, cached per lobby
+prediction_jobs = AnalysisJobs(lambda riot_id, teams: explain_match_prediction(riot_id, teams))
 
 @app.route('/champions')
 def champions():
-    return render_template('champions.html')
+    return render_template('champions.html', asset_base_url=static_data.index.asset_base_url())
+
+@app.route('/api/champions')
+@response_cache.cached(ttl=10, cache_control='public, max-age=60')
+def get_champion_stats():
+    """Precomputed champion table: pick rate, win rate, KDA and game length"""
+    return Response(champion_stats.payload(), mimetype='application/json')
+
+# Apex-tier ladder per platform, refreshed in the background; requests only
+# slice the index. These platforms start refreshing at startup, the others
+# when first requested
+LEADERBOARD_PLATFORMS = os.getenv('LEADERBOARD_PLATFORMS', DEFAULT_PLATFORM).split(',')
+ladders = {
+    platform: Leaderboard(riot, region.platform_url, region.account_url) for platform, region in REGIONS.items()
+}
 
 @app.route('/leaderboard')
 def leaderboard():
     return render_template('leaderboard.html')
 
+@app.route('/api/leaderboard')
+@response_cache.cached(ttl=30, cache_control='public, max-age=30')
+def get_leaderboard():
+    """One page of the precomputed ladder: ?page=&per_page=&tier=&region="""
+    try:
+        region = get_region(request.args.get('region'))
+    except UnknownRegion as e:
+        return jsonify({'error': str(e)}), 400
+    ladder = ladders[region.platform]
+    index = ladder.current()
+    tier = request.args.get('tier', type=str)
+    tier = tier.upper() if tier else None
+    if tier and tier not in dict(TIERS):
+        return jsonify({'error': f'Unknown tier: {tier}'}), 400
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), MAX_PAGE_SIZE)
+
+    entries, total = index.page(page, per_page, tier)
+    body = jsonify({
+        'queue': ladder.queue,
+        'region': region.platform,
+        'tier': tier,
+        'page': page,
+        'perPage': per_page,
+        'total': total,
+        'updatedAt': index.updated_at,
+        'entries': entries
+    })
+    if index.updated_at is None:
+        # First refresh still running: 202 is neither cached here nor by clients
+        body.headers['Cache-Control'] = 'no-store'
+        return body, 202
+    return body
+
+def spectator_variants(region):
+    """Spectator endpoint variants, in the order they are tried until one proves to work"""
+    return [
+        ('v4-by-summoner', f"{region.platform_url}/lol/spectator/v4/active-games/by-summoner/{{summoner_id}}",
+         'summoner_id'),
+        ('v5-by-puuid', f"{region.platform_url}/lol/spectator/v5/active-games/by-puuid/{{puuid}}", 'puuid'),
+        ('v5-by-puuid-regional', f"{region.regional_url}/lol/spectator/v5/active-games/by-puuid/{{puuid}}", 'puuid'),
+        ('v4-by-puuid', f"{region.platform_url}/lol/spectator/v4/active-games/by-puuid/{{puuid}}", 'puuid'),
+    ]
+
+# Working spectator variant and circuit breakers, learned per platform
+spectator_routers = {platform: SpectatorRouter(riot, spectator_variants(region)) for platform, region in REGIONS.items()}
+
+# Enriched teams and prediction per active game, keyed by (platformId, gameId)
+LIVE_GAME_TTL = 3600
+live_games = TTLCache(max_entries=2000)
+
+# One spectator poller per watched player, shared by all of its SSE viewers
+live_watcher = LiveGameWatcher(lambda riot_id, region: load_live_game(riot_id, region))
+
 @app.route('/api/live-game/<path:riot_id>')
+@response_cache.cached(ttl=10, cache_control='public, max-age=10')
 def get_live_game(riot_id):
     """Check if player is in an active game and get all players' data"""
     try:
-        # Parse gamename and tag from riot_id
-        if '#' not in riot_id:
-            return jsonify({'error': 'Invalid Riot ID format. Use gamename#tag'}), 400
-
-        gamename, tag = riot_id.split('#', 1)
-        from urllib.parse import quote
-        encoded_gamename = quote(gamename, safe='')
-        encoded_tag = quote(tag, safe='')
-
-        # Get account info using Riot ID
-        account_url = f"{EUROPE_BASE_URL}/riot/account/v1/accounts/by-riot-id/{encoded_gamename}/{encoded_tag}"
-        headers = {'X-Riot-Token': RIOT_API_KEY}
-        
-        account_response = requests.get(account_url, headers=headers)
-        if account_response.status_code != 200:
-            return jsonify({'error': 'Account not found'}), 404
-
-        account_data = account_response.json()
-        puuid = account_data['puuid']
-
-        # Get summoner info to get summoner ID
-        summoner_url = f"{RIOT_BASE_URL}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-        summoner_response = requests.get(summoner_url, headers=headers)
-        
-        if summoner_response.status_code != 200:
-            return jsonify({'error': 'Summoner not found'}), 404
-
-        summoner_data = summoner_response.json()
-        summoner_id = summoner_data.get('id')
-        
-        # Add detailed debugging
-        print(f"Summoner response keys: {list(summoner_data.keys())}")
-        print(f"Full summoner data: {summoner_data}")
-        
-        # Check if summoner ID is in different field
-        summoner_id = summoner_data.get('id') or summoner_data.get('accountId') or summoner_data.get('summonerId')
-        
-        # For newer accounts that don't have summoner ID, try to get it differently
-        if not summoner_id:
-            print(f"No summoner ID in original response, trying alternative methods...")
-            # The same endpoint should return id, but let's try explicitly
-            print(f"Trying summoner API again explicitly...")
-            summoner_by_puuid_url = f"{RIOT_BASE_URL}/lol/summoner/v4/summoners/by-puuid/{puuid}"
-            print(f"Summoner by PUUID URL: {summoner_by_puuid_url}")
-            summoner_by_puuid_response = requests.get(summoner_by_puuid_url, headers=headers)
-            print(f"Summoner by PUUID response status: {summoner_by_puuid_response.status_code}")
-            print(f"Summoner by PUUID response: {summoner_by_puuid_response.text}")
-            if summoner_by_puuid_response.status_code == 200:
-                summoner_by_puuid_data = summoner_by_puuid_response.json()
-                summoner_id = summoner_by_puuid_data.get('id')
-                print(f"Summoner by PUUID data keys: {list(summoner_by_puuid_data.keys())}")
-                if summoner_id:
-                    print(f"Found summoner ID via PUUID: {summoner_id}")
-                else:
-                    print(f"Still no summoner ID found, full data: {summoner_by_puuid_data}")
-
-        # Try multiple approaches to check for active game
-        live_response = None
-        
-        # First try with summoner ID if available
-        if summoner_id:
-            live_game_url = f"{RIOT_BASE_URL}/lol/spectator/v4/active-games/by-summoner/{summoner_id}"
-            live_response = requests.get(live_game_url, headers=headers)
-            print(f"Tried summoner ID approach, status: {live_response.status_code}")
-        
-        # Try spectator APIs, but handle permission errors gracefully
-        if not summoner_id or (live_response and live_response.status_code not in [200, 404]):
-            print(f"Trying V5 API with PUUID...")
-            live_game_url_v5 = f"{RIOT_BASE_URL}/lol/spectator/v5/active-games/by-puuid/{puuid}"
-            live_response_v5 = requests.get(live_game_url_v5, headers=headers)
-            print(f"V5 API status: {live_response_v5.status_code}")
-            if live_response_v5.status_code in [200, 404]:
-                live_response = live_response_v5
-            elif live_response_v5.status_code == 403:
-                print("Spectator API access denied - using fallback method")
-                return create_fallback_live_game_response(puuid, account_data)
-            else:
-                print(f"V5 API failed, trying different region...")
-                # Try with different base URL (some endpoints might be on different servers)
-                live_game_url_europe = f"{EUROPE_BASE_URL}/lol/spectator/v5/active-games/by-puuid/{puuid}"
-                live_response_europe = requests.get(live_game_url_europe, headers=headers)
-                print(f"Europe V5 API status: {live_response_europe.status_code}")
-                if live_response_europe.status_code in [200, 404]:
-                    live_response = live_response_europe
-                elif live_response_europe.status_code == 403:
-                    print("Spectator API access denied - using fallback method")
-                    return create_fallback_live_game_response(puuid, account_data)
-                else:
-                    # Last resort: try older endpoint formats
-                    live_game_url_alt = f"{RIOT_BASE_URL}/lol/spectator/v4/active-games/by-puuid/{puuid}"
-                    live_response_alt = requests.get(live_game_url_alt, headers=headers)
-                    print(f"Alternative API status: {live_response_alt.status_code}")
-                    if live_response_alt.status_code == 403:
-                        print("All spectator APIs denied - using fallback method")
-                        return create_fallback_live_game_response(puuid, account_data)
-                    live_response = live_response_alt
-
-        # Check if we have a valid response
-        if not live_response:
-            return jsonify({'error': 'Could not connect to live game API'}), 500
-
-        if live_response.status_code == 403:
-            print("Spectator API access denied - using fallback method")
-            return create_fallback_live_game_response(puuid, account_data)
-        elif live_response.status_code == 404:
-            return jsonify({'inGame': False, 'message': 'Player not in game'}), 200
-        elif live_response.status_code != 200:
-            return jsonify({'error': f'API error: {live_response.status_code}'}), 500
-
-        live_data = live_response.json()
-
-        # Process participants data
-        participants = []
-        for participant in live_data['participants']:
-            # Get additional summoner data for each participant
-            participant_data = {
-                'summonerName': participant['summonerName'],
-                'championId': participant['championId'],
-                'championName': get_champion_name(participant['championId']),
-                'teamId': participant['teamId'],
-                'spell1Id': participant['spell1Id'],
-                'spell2Id': participant['spell2Id'],
-                'isBot': participant.get('bot', False),
-                'puuid': participant.get('puuid', ''),
-                'profileIconId': participant.get('profileIconId', 0),
-                'summonerLevel': participant.get('summonerLevel', 0)
-            }
-            
-            # Try to get ranked info for this participant if not a bot
-            if not participant_data['isBot'] and 'summonerId' in participant:
-                ranked_url = f"{RIOT_BASE_URL}/lol/league/v4/entries/by-summoner/{participant['summonerId']}"
-                ranked_response = requests.get(ranked_url, headers=headers)
-                if ranked_response.status_code == 200:
-                    ranked_data = ranked_response.json()
-                    solo_queue = next((entry for entry in ranked_data if entry['queueType'] == 'RANKED_SOLO_5x5'), None)
-                    if solo_queue:
-                        participant_data['rank'] = {
-                            'tier': solo_queue['tier'],
-                            'rank': solo_queue['rank'],
-                            'leaguePoints': solo_queue['leaguePoints'],
-                            'wins': solo_queue['wins'],
-                            'losses': solo_queue['losses']
-                        }
-                    else:
-                        participant_data['rank'] = {'tier': 'UNRANKED', 'rank': '', 'leaguePoints': 0, 'wins': 0, 'losses': 0}
-                else:
-                    participant_data['rank'] = {'tier': 'UNRANKED', 'rank': '', 'leaguePoints': 0, 'wins': 0, 'losses': 0}
-            else:
-                participant_data['rank'] = {'tier': 'UNRANKED', 'rank': '', 'leaguePoints': 0, 'wins': 0, 'losses': 0}
+        status, body = load_live_game(riot_id, region_param(request.args.get('region')))
+        return jsonify(body), status
+    except UnknownRegion as e:
+        return jsonify({'error': str(e)}), 400
+    except RateLimitExceeded as e:
+        return rate_limited_response(e)
+    except Exception as e:
+        log_event('route_error', level=logging.ERROR, route='get_live_game', error=str(e))
+        return jsonify({'error': str(e)}), 500
 
-            participants.append(participant_data)
+@app.route('/api/live-game/<path:riot_id>/events')
+def live_game_events(riot_id):
+    """Server-Sent Events for a live game: state, then update deltas, then ended"""
+    if '#' not in riot_id:
+        return jsonify({'error': 'Invalid Riot ID format. Use gamename#tag'}), 400
+    try:
+        region = region_param(request.args.get('region'))
+    except UnknownRegion as e:
+        return jsonify({'error': str(e)}), 400
 
-        # Separate teams
-        team1 = [p for p in participants if p['teamId'] == 100]
-        team2 = [p for p in participants if p['teamId'] == 200]
+    subscription = live_watcher.subscribe(riot_id, region)
 
-        # Get match prediction
-        prediction = predict_match_outcome(team1, team2)
+    def events():
+        try:
+            for item in subscription.events():
+                if item is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                event, data = item
+                yield sse_event(data, event=event)
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def load_live_game(riot_id, region=None):
+    """(status, body) for a player's active game, enriched with ranks and a prediction"""
+    if '#' not in riot_id:
+        return 400, {'error': 'Invalid Riot ID format. Use gamename#tag'}
+
+    gamename, tag = riot_id.split('#', 1)
+
+    # Get account info using Riot ID
+    account_status, account_data = fetch_account(gamename, tag)
+    if account_status != 200:
+        if account_status == 404:
+            return 404, {'error': 'Account not found'}
+        return 500, {'error': f'API Error: {account_status}'}
+
+    puuid = account_data['puuid']
+    requested = region
+    region = resolve_region(puuid, tag, requested)
+
+    # The summoner ID never changes, so this is usually served from cache
+    summoner_id = identity_cache.get_summoner_id(region.platform, puuid)
+    if summoner_id is MISSING:
+        summoner_status, summoner_data = fetch_summoner(region, puuid)
+        if summoner_status != 200:
+            relocated = relocated_region(puuid, region) if summoner_status == 404 and requested is None else None
+            if relocated:
+                return load_live_game(riot_id, relocated)
+            if summoner_status == 404:
+                return 404, {'error': 'Summoner not found'}
+            return 500, {'error': f'Summoner API error: {summoner_status}'}
+        summoner_id = extract_summoner_id(summoner_data)
+
+    # Goes straight to the spectator variant that worked last time; variants
+    # that are forbidden for this key or failing are skipped by their breakers
+    live_response = spectator_routers[region.platform].fetch(puuid, summoner_id)
+    if live_response is None:
+        log_event('spectator_fallback', puuid=puuid, region=region.platform)
+        return 200, create_fallback_live_game_response(region, puuid, account_data)
+
+    if live_response.status_code == 404:
+        return 200, {'inGame': False, 'message': 'Player not in game'}
+    elif live_response.status_code != 200:
+        return 500, {'error': f'API error: {live_response.status_code}'}
+
+    live_data = live_response.json()
+
+    # Ranks and the prediction are fixed for the whole game, so every poll
+    # and every viewer of the same game reuses the first enrichment
+    game_id = live_data.get('gameId')
+    platform_id = live_data.get('platformId', '')
+    if game_id:
+        enriched = live_games.get((platform_id, game_id))
+        if enriched is MISSING:
+            enriched = lookups.do(('live-game', platform_id, game_id), enrich_live_game, riot_id, live_data, region)
+            live_games.set((platform_id, game_id), enriched, LIVE_GAME_TTL)
+    else:
+        enriched = enrich_live_game(riot_id, live_data, region)
+    team1, team2, prediction = enriched
+
+    return 200, {
+        'inGame': True,
+        'matchId': f"{platform_id}_{game_id}" if game_id else None,
+        'region': region.platform,
+        'gameMode': live_data.get('gameMode', 'Unknown'),
+        'gameLength': live_data.get('gameLength', 0),
+        'gameQueueConfigId': live_data.get('gameQueueConfigId', 0),
+        'team1': team1,
+        'team2': team2,
+        'prediction': prediction,
+        'ddragonVersion': static_data.index.version
+    }
 
-        return jsonify({
-            'inGame': True,
-            'gameMode': live_data.get('gameMode', 'Unknown'),
-            'gameLength': live_data.get('gameLength', 0),
-            'gameQueueConfigId': live_data.get('gameQueueConfigId', 0),
-            'team1': team1,
-            'team2': team2,
-            'prediction': prediction
+def enrich_live_game(riot_id, live_data, region):
+    """(team1, team2, prediction) for a spectator payload"""
+    assets = static_data.index
+    participants = []
+    for participant in live_data['participants']:
+        # Get additional summoner data for each participant
+        champion = assets.champion(participant['championId'])
+        participants.append({
+            'summonerName': participant['summonerName'],
+            'championId': participant['championId'],
+            'championName': champion['name'],
+            'championKey': champion['key'],
+            'championIcon': assets.champion_icon(participant['championId']),
+            'teamId': participant['teamId'],
+            'spell1Id': participant['spell1Id'],
+            'spell2Id': participant['spell2Id'],
+            'spell1Icon': assets.spell_icon(participant['spell1Id']),
+            'spell2Icon': assets.spell_icon(participant['spell2Id']),
+            'isBot': participant.get('bot', False),
+            'puuid': participant.get('puuid', ''),
+            'profileIconId': participant.get('profileIconId', 0),
+            'profileIconUrl': assets.profile_icon(participant.get('profileIconId', 0)),
+            'summonerLevel': participant.get('summonerLevel', 0)
         })
 
-    except Exception as e:
-        print(f"Error in get_live_game: {str(e)}")
-        return jsonify({'error': str(e)}), 500
-
-def get_champion_name(champion_id):
-    """Simple champion ID to name mapping - in a real app you'd use Riot's Data Dragon"""
-    champion_map = {
-        1: "Annie", 2: "Olaf", 3: "Galio", 4: "Twisted Fate", 5: "Xin Zhao",
-        6: "Urgot", 7: "LeBlanc", 8: "Vladimir", 9: "Fiddlesticks", 10: "Kayle",
-        11: "Master Yi", 12: "Alistar", 13: "Ryze", 14: "Sion", 15: "Sivir",
-        16: "Soraka", 17: "Teemo", 18: "Tristana", 19: "Warwick", 20: "Nunu",
-        21: "Miss Fortune", 22: "Ashe", 23: "Tryndamere", 24: "Jax", 25: "Morgana",
-        26: "Zilean", 27: "Singed", 28: "Evelynn", 29: "Twitch", 30: "Karthus",
-        31: "Cho'Gath", 32: "Amumu", 33: "Rammus", 34: "Anivia", 35: "Shaco",
-        36: "Dr. Mundo", 37: "Sona", 38: "Kassadin", 39: "Irelia", 40: "Janna",
-        41: "Gangplank", 42: "Corki", 43: "Karma", 44: "Taric", 45: "Veigar",
-        48: "Trundle", 50: "Swain", 51: "Caitlyn", 53: "Blitzcrank", 54: "Malphite",
-        55: "Katarina", 56: "Nocturne", 57: "Maokai", 58: "Renekton", 59: "Jarvan IV",
-        60: "Elise", 61: "Orianna", 62: "Wukong", 63: "Brand", 64: "Lee Sin",
-        67: "Vayne", 68: "Rumble", 69: "Cassiopeia", 72: "Skarner", 74: "Heimerdinger",
-        75: "Nasus", 76: "Nidalee", 77: "Udyr", 78: "Poppy", 79: "Gragas",
-        80: "Pantheon", 81: "Ezreal", 82: "Mordekaiser", 83: "Yorick", 84: "Akali",
-        85: "Kennen", 86: "Garen", 89: "Leona", 90: "Malzahar", 91: "Talon",
-        92: "Riven", 96: "Kog'Maw", 98: "Shen", 99: "Lux", 101: "Xerath",
-        102: "Shyvana", 103: "Ahri", 104: "Graves", 105: "Fizz", 106: "Volibear",
-        107: "Rengar", 110: "Varus", 111: "Nautilus", 112: "Viktor", 113: "Sejuani",
-        114: "Fiora", 115: "Ziggs", 117: "Lulu", 119: "Draven", 120: "Hecarim",
-        121: "Kha'Zix", 122: "Darius", 126: "Jayce", 127: "Lissandra", 131: "Diana",
-        133: "Quinn", 134: "Syndra", 136: "Aurelion Sol", 141: "Kayn", 142: "Zoe",
-        143: "Zyra", 145: "Kai'Sa", 147: "Seraphine", 150: "Gnar", 154: "Zac",
-        157: "Yasuo", 161: "Vel'Koz", 163: "Taliyah", 164: "Camille", 166: "Akshan",
-        200: "Bel'Veth", 201: "Braum", 202: "Jhin", 203: "Kindred", 221: "Zeri",
-        222: "Jinx", 223: "Tahm Kench", 234: "Viego", 235: "Senna", 236: "Lucian",
-        238: "Zed", 240: "Kled", 245: "Ekko", 246: "Qiyana", 254: "Vi",
-        266: "Aatrox", 267: "Nami", 268: "Azir", 350: "Yuumi", 360: "Samira",
-        412: "Thresh", 420: "Illaoi", 421: "Rek'Sai", 427: "Ivern", 429: "Kalista",
-        432: "Bard", 516: "Ornn", 517: "Sylas", 518: "Neeko", 523: "Aphelios",
-        526: "Rell", 555: "Pyke", 777: "Yone", 875: "Sett", 876: "Lillia",
-        887: "Gwen", 888: "Renata Glasc", 895: "Nilah", 897: "K'Sante", 901: "Smolder",
-        902: "Aurora", 950: "Naafiri", 910: "Hwei"
+    # Look up ranks for all participants at once; failed or slow lookups stay UNRANKED
+    ranks = fetch_participant_ranks(region, live_data['participants'])
+    for participant_data, rank in zip(participants, ranks):
+        participant_data['rank'] = rank
+
+    # Separate teams
+    team1 = [p for p in participants if p['teamId'] == 100]
+    team2 = [p for p in participants if p['teamId'] == 200]
+
+    # Get match prediction - the local model answers instantly, the LLM
+    # explanation (if enabled) is produced in the background
+    prediction = predict_match_outcome(team1, team2)
+    if ai_explanations_enabled():
+        job = prediction_jobs.submit(riot_id, {'team1': team1, 'team2': team2})
+        prediction['explanationUrl'] = f"/api/live-game/explanations/{job['id']}"
+    return team1, team2, prediction
+
+def unranked():
+    return {'tier': 'UNRANKED', 'rank': '', 'leaguePoints': 0, 'wins': 0, 'losses': 0}
+
+def solo_queue_rank(ranked_data):
+    """Extract the Solo/Duo rank dict from a league entries list"""
+    solo_queue = next((entry for entry in ranked_data if entry['queueType'] == 'RANKED_SOLO_5x5'), None)
+    if not solo_queue:
+        return unranked()
+    return {
+        'tier': solo_queue['tier'],
+        'rank': solo_queue['rank'],
+        'leaguePoints': solo_queue['leaguePoints'],
+        'wins': solo_queue['wins'],
+        'losses': solo_queue['losses']
     }
-    return champion_map.get(champion_id, f"Champion {champion_id}")
 
-def create_fallback_live_game_response(puuid, account_data):
+def fetch_participant_ranks(region, participants, timeout=RANK_LOOKUP_TIMEOUT):
+    """Fetch Solo/Duo ranks for live-game participants concurrently.
+
+    Returns one rank dict per participant, in order. Bots, participants
+    without a summoner ID and lookups that fail or miss the deadline are
+    reported as UNRANKED instead of failing the whole response.
+    """
+    futures = {}
+    for index, participant in enumerate(participants):
+        if not participant.get('bot', False) and 'summonerId' in participant:
+            ranked_url = f"{region.platform_url}/lol/league/v4/entries/by-summoner/{participant['summonerId']}"
+            futures[index] = upstream_pool.submit(riot.get, ranked_url)
+
+    wait(futures.values(), timeout=timeout)
+
+    ranks = []
+    for index in range(len(participants)):
+        future = futures.get(index)
+        rank = unranked()
+        if future and future.done():
+            if future.exception():
+                log_event('rank_lookup_failed', level=logging.WARNING, error=str(future.exception()))
+            elif future.result().status_code == 200:
+                rank = solo_queue_rank(future.result().json())
+        elif future:
+            future.cancel()
+        ranks.append(rank)
+    return ranks
+
+@app.route('/api/live-game/explanations/<job_id>')
+def get_prediction_explanation(job_id):
+    # Optional long-poll: ?wait=N blocks up to N seconds for the explanation
+    wait_seconds = min(request.args.get('wait', 0, type=float), 30)
+    job = prediction_jobs.wait(job_id, timeout=wait_seconds) if wait_seconds > 0 else prediction_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    """Score many lobbies in one call: {"lobbies": [{"team1": [...], "team2": [...]}, ...]}"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with lobbies'}), 400
+    lobbies = data.get('lobbies', [])
+    if not isinstance(lobbies, list):
+        return jsonify({'error': 'lobbies must be a list'}), 400
+    for index, lobby in enumerate(lobbies):
+        error = win_model.lobby_error(lobby)
+        if error:
+            return jsonify({'error': f'lobbies[{index}]: {error}'}), 400
+    predictions = win_model.predict_batch(
+        [(lobby.get('team1', []), lobby.get('team2', [])) for lobby in lobbies],
+        champion_stats.strength()
+    )
+    return jsonify({'predictions': predictions})
+
+def ai_explanations_enabled():
+    if os.getenv('LIVE_GAME_AI_EXPLANATIONS', '1') != '1':
+        return False
+    return bool(OPENROUTE_API_KEY) and OPENROUTE_API_KEY != 'your-openroute-api-key-here'
+
+def create_fallback_live_game_response(region, puuid, account_data):
     """Create a fallback response when spectator API is not available"""
     try:
         # Check recent games to estimate if player might be in a game
         # This is an approximation since we can't access live game data
-        headers = {'X-Riot-Token': RIOT_API_KEY}
-        
         # Get very recent matches to see activity
-        recent_matches_url = f"{EUROPE_BASE_URL}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count=3"
-        recent_response = requests.get(recent_matches_url, headers=headers)
+        recent_matches_url = f"{region.regional_url}/lol/match/v5/matches/by-puuid/{puuid}/ids?start=0&count=3"
+        recent_response = riot.get(recent_matches_url)
         
         if recent_response.status_code == 200:
             match_ids = recent_response.json()
             if match_ids:
                 # Get the most recent match details
-                latest_match_url = f"{EUROPE_BASE_URL}/lol/match/v5/matches/{match_ids[0]}"
-                match_response = requests.get(latest_match_url, headers=headers)
+                latest_match = get_match(match_ids[0])
                 
-                if match_response.status_code == 200:
-                    match_data = match_response.json()
-                    game_end_timestamp = match_data['info']['gameEndTimestamp']
+                if latest_match:
+                    game_end_timestamp = latest_match.game_end_timestamp
                     current_timestamp = int(time.time() * 1000)
                     time_since_game = current_timestamp - game_end_timestamp
                     
                     # If last game ended less than 5 minutes ago, player might be in queue/loading
                     if time_since_game < 300000:  # 5 minutes in milliseconds
-                        return jsonify({
+                        return {
                             'inGame': 'unknown',
                             'message': 'Live Game API não disponível',
                             'fallbackInfo': {
@@ -521,24 +1049,33 @@ def create_fallback_live_game_response(puuid, account_data):
                                 'suggestion': f'Ostatnia gra gracza {account_data["gameName"]} zakończyła się {round(time_since_game / 60000, 1)} minut temu. Gracz może być w kolejce lub nowej grze.',
                                 'note': 'Live Game tracking wymaga uprawnień produkcyjnych API od Riot Games'
                             }
-                        })
+                        }
         
-        return jsonify({
+        return {
             'inGame': False, 
             'message': 'Live Game API niedostępne - wymaga uprawnień produkcyjnych',
             'fallbackInfo': {
                 'note': 'Funkcja Live Game wymaga specjalnych uprawnień od Riot Games API',
                 'available': 'Sprawdź profil gracza, aby zobaczyć ostatnie mecze'
             }
-        })
+        }
     except Exception as e:
-        print(f"Fallback error: {e}")
-        return jsonify({
+        log_event('live_game_fallback_error', level=logging.ERROR, error=str(e))
+        return {
             'inGame': False, 
             'message': 'Nie można sprawdzić stanu gry na żywo'
-        })
+        }
 
 def predict_match_outcome(team1, team2):
+    """Predict match outcome with the local rank-based model (no network calls)"""
+    return win_model.predict(team1, team2, champion_stats.strength())
+
+def explain_match_prediction(riot_id, teams):
+    """LLM reasoning for a live game, run as a background job. Returns (text, ok)"""
+    prediction = predict_match_outcome_with_ai(teams['team1'], teams['team2'])
+    return prediction.get('reasoning', ''), prediction.get('source') == 'ai'
+
+def predict_match_outcome_with_ai(team1, team2):
     """Use AI to predict match outcome based on team compositions and player stats"""
     try:
         headers = {
@@ -577,17 +1114,17 @@ def predict_match_outcome(team1, team2):
             "temperature": 0.3
         }
 
-        response = requests.post(OPENROUTE_API_URL, headers=headers, json=payload)
+        response = openrouter_post(headers, payload)
         if response.status_code == 200:
             ai_response = response.json()['choices'][0]['message']['content']
             # Try to extract JSON from response
-            import json
             try:
                 # Look for JSON in the response
                 start = ai_response.find('{')
                 end = ai_response.rfind('}') + 1
                 if start != -1 and end != 0:
                     prediction_data = json.loads(ai_response[start:end])
+                    prediction_data['source'] = 'ai'
                     return prediction_data
             except json.JSONDecodeError:
                 pass
@@ -596,7 +1133,8 @@ def predict_match_outcome(team1, team2):
             return {
                 'team1_win_chance': 50,
                 'team2_win_chance': 50,
-                'reasoning': ai_response
+                'reasoning': ai_response,
+                'source': 'ai'
             }
         else:
             return {
@@ -606,16 +1144,72 @@ def predict_match_outcome(team1, team2):
             }
 
     except Exception as e:
-        print(f"Prediction error: {e}")
+        log_event('prediction_error', level=logging.ERROR, error=str(e))
         return {
             'team1_win_chance': 50,
             'team2_win_chance': 50,
             'reasoning': f'Błąd przewidywania: {str(e)}'
         }
 
+@app.route('/api/static-data')
+@response_cache.cached(ttl=60, cache_control='public, max-age=300')
+def get_static_data():
+    """Active Data Dragon version and the snapshots available on disk"""
+    index = static_data.index
+    return jsonify({
+        'version': index.version,
+        'availableVersions': static_data.available_versions(),
+        'champions': len(index.champions),
+        'summonerSpells': len(index.spells),
+        'profileIcons': len(index.profile_icons),
+        'assetBaseUrl': index.asset_base_url()
+    })
+
+@app.route('/api/static-data/reload', methods=['POST'])
+def reload_static_data():
+    """Hot-swap to another installed patch: {"version": "14.1.1"} (newest when omitted).
+
+    Only the worker that serves this request switches. With WEB_WORKERS > 1,
+    set DDRAGON_VERSION and send gunicorn's master a HUP to restart every
+    worker on the new patch instead.
+    """
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token or request.headers.get('X-Admin-Token') != admin_token:
+        return jsonify({'error': 'Forbidden'}), 403
+    data = request.get_json(silent=True) or {}
+    index = static_data.load(data.get('version'))
+    return jsonify({'version': index.version, 'champions': len(index.champions), 'worker': os.getpid()})
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus text exposition of the in-process metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
+@response_cache.cached(ttl=0, cache_control='no-cache')
 def health_check():
-    return jsonify({'status': 'healthy'})
+    # Only platforms that have served spectator traffic (plus the default)
+    spectator = {
+        platform: router.status() for platform, router in spectator_routers.items()
+        if platform == DEFAULT_PLATFORM or router.preferred
+    }
+    return jsonify({'status': 'healthy', 'spectator': spectator})
+
+def start_background_tasks():
+    """Start the background builders and refreshers.
+
+    Called once per serving process (gunicorn's post_worker_init hook, or the
+    dev server below) rather than on import, so scripts that import this
+    module, such as backfill.py, don't start them.
+    """
+    static_data.start()
+    champion_stats.start()
+    for platform in LEADERBOARD_PLATFORMS:
+        ladders[platform_for(platform)].start()
+    # Matches written by other processes (backfill.py) reach the aggregates here
+    match_store.follow()
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    start_background_tasks()
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    app.run(host='0.0.0.0', port=int(os.getenv('PORT', '5000')), debug=os.getenv('FLASK_DEBUG') == '1')
\ No newline at end of file
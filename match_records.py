@@ -0,0 +1,125 @@
+import sys
+from array import array
+
+
+class MatchRecord:
+    """Compact, fixed-schema projection of a match/v5 payload.
+
+    Only the fields the app uses are kept. Per-participant values are
+    stored column-wise in typed arrays (one slot per participant) instead
+    of ten nested dicts, and strings are interned, so thousands of matches
+    can stay in memory.
+    """
+
+    __slots__ = (
+        'match_id', 'game_mode', 'queue_id', 'game_duration', 'game_end_timestamp',
+        'puuids', 'champion_names', 'champion_ids', 'team_ids', 'wins', 'kills', 'deaths', 'assists',
+    )
+
+    def __init__(self, match_id, game_mode, queue_id, game_duration, game_end_timestamp,
+                 puuids, champion_names, champion_ids, team_ids, wins, kills, deaths, assists):
+        self.match_id = match_id
+        self.game_mode = sys.intern(game_mode)
+        self.queue_id = queue_id
+        self.game_duration = game_duration
+        self.game_end_timestamp = game_end_timestamp
+        self.puuids = tuple(puuids)
+        self.champion_names = tuple(sys.intern(name) for name in champion_names)
+        self.champion_ids = array('H', champion_ids)
+        self.team_ids = array('H', team_ids)
+        self.wins = array('b', wins)
+        self.kills = array('H', kills)
+        self.deaths = array('H', deaths)
+        self.assists = array('H', assists)
+
+    @classmethod
+    def from_match(cls, match_data):
+        """Project a raw match/v5 payload"""
+        info = match_data['info']
+        participants = info['participants']
+        return cls(
+            match_id=match_data.get('metadata', {}).get('matchId') or f"{info.get('platformId', '')}_{info.get('gameId', '')}",
+            game_mode=info.get('gameMode', ''),
+            queue_id=info.get('queueId', 0),
+            game_duration=info.get('gameDuration', 0),
+            game_end_timestamp=info.get('gameEndTimestamp', 0),
+            puuids=[p['puuid'] for p in participants],
+            champion_names=[p['championName'] for p in participants],
+            champion_ids=[p.get('championId', 0) for p in participants],
+            team_ids=[p.get('teamId', 0) for p in participants],
+            wins=[1 if p['win'] else 0 for p in participants],
+            kills=[p['kills'] for p in participants],
+            deaths=[p['deaths'] for p in participants],
+            assists=[p['assists'] for p in participants],
+        )
+
+    def to_row(self):
+        """Plain list for JSON persistence; inverse of ``from_row``"""
+        return [
+            self.match_id, self.game_mode, self.queue_id, self.game_duration, self.game_end_timestamp,
+            list(self.puuids), list(self.champion_names), self.champion_ids.tolist(), self.team_ids.tolist(),
+            self.wins.tolist(), self.kills.tolist(), self.deaths.tolist(), self.assists.tolist(),
+        ]
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row)
+
+    def __len__(self):
+        return len(self.puuids)
+
+    def participant_index(self, puuid):
+        try:
+            return self.puuids.index(puuid)
+        except ValueError:
+            return None
+
+    def participant(self, puuid):
+        """Row view for one player, or None if they did not play in this match"""
+        index = self.participant_index(puuid)
+        return None if index is None else ParticipantRow(self, index)
+
+    def participants(self):
+        return [ParticipantRow(self, index) for index in range(len(self))]
+
+
+class ParticipantRow:
+    """Read-only view of one participant's slot in a MatchRecord"""
+
+    __slots__ = ('record', 'index')
+
+    def __init__(self, record, index):
+        self.record = record
+        self.index = index
+
+    @property
+    def puuid(self):
+        return self.record.puuids[self.index]
+
+    @property
+    def champion_name(self):
+        return self.record.champion_names[self.index]
+
+    @property
+    def champion_id(self):
+        return self.record.champion_ids[self.index]
+
+    @property
+    def team_id(self):
+        return self.record.team_ids[self.index]
+
+    @property
+    def win(self):
+        return bool(self.record.wins[self.index])
+
+    @property
+    def kills(self):
+        return self.record.kills[self.index]
+
+    @property
+    def deaths(self):
+        return self.record.deaths[self.index]
+
+    @property
+    def assists(self):
+        return self.record.assists[self.index]
@@ -0,0 +1,221 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from match_records import MatchRecord
+from telemetry import log_event
+
+DEFAULT_PATH = os.getenv('MATCH_STORE_PATH', os.path.join('data', 'matches.sqlite3'))
+DEFAULT_CAPACITY = int(os.getenv('MATCH_CACHE_SIZE', '20000'))
+# Seconds between checks for rows written by other processes (e.g. backfill.py)
+POLL_INTERVAL = int(os.getenv('MATCH_STORE_POLL', '30'))
+
+
+class MatchStore:
+    """Two-tier store for finished matches, keyed by match ID.
+
+    Raw match/v5 payloads are projected into compact MatchRecords on the
+    way in. Finished matches never change, so entries never expire: a
+    bounded in-memory LRU of records sits in front of a SQLite table
+    holding the zlib-compressed record rows. A ``path`` of ``None`` keeps
+    the store memory-only.
+
+    Every stored match is also indexed by participant PUUID so a player's
+    stored history can be paged newest first, and listeners registered with
+    ``add_listener`` are told about each record as it is stored. Rows other
+    processes add to the same SQLite file reach the listeners through
+    ``catch_up``, which ``follow`` runs periodically in a background thread.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._listeners = []
+        # Highest rowid handed to the listeners, and rows this process wrote above it
+        self._last_rowid = 0
+        self._own_rowids = set()
+        self._stop = threading.Event()
+        self._thread = None
+        # puuid -> {match_id: game_end_timestamp}, only used without SQLite
+        self._players = {}
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS match_records (match_id TEXT PRIMARY KEY, record BLOB NOT NULL)'
+            )
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS match_players ('
+                'puuid TEXT NOT NULL, match_id TEXT NOT NULL, game_end_timestamp INTEGER NOT NULL, '
+                'PRIMARY KEY (puuid, match_id))'
+            )
+            self._db.execute(
+                'CREATE INDEX IF NOT EXISTS match_players_recent ON match_players (puuid, game_end_timestamp DESC)'
+            )
+            self._db.commit()
+            self._last_rowid = self._db.execute('SELECT COALESCE(MAX(rowid), 0) FROM match_records').fetchone()[0]
+
+    def _index_players(self, record):
+        if self._db is None:
+            for puuid in record.puuids:
+                self._players.setdefault(puuid, {})[record.match_id] = record.game_end_timestamp
+            return
+        self._db.executemany(
+            'INSERT OR IGNORE INTO match_players (puuid, match_id, game_end_timestamp) VALUES (?, ?, ?)',
+            [(puuid, record.match_id, record.game_end_timestamp) for puuid in record.puuids]
+        )
+
+    def add_listener(self, listener):
+        """Call ``listener(record)`` for every record stored from now on"""
+        self._listeners.append(listener)
+
+    def _remember(self, match_id, record):
+        self._memory[match_id] = record
+        self._memory.move_to_end(match_id)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def get(self, match_id):
+        """Return the MatchRecord for ``match_id``, or None"""
+        with self._lock:
+            record = self._memory.get(match_id)
+            if record is not None:
+                self._memory.move_to_end(match_id)
+                return record
+            if self._db is None:
+                return None
+            row = self._db.execute('SELECT record FROM match_records WHERE match_id = ?', (match_id,)).fetchone()
+            if row is None:
+                return None
+            record = MatchRecord.from_row(json.loads(zlib.decompress(row[0])))
+            self._remember(match_id, record)
+            return record
+
+    def put(self, match_id, match_data):
+        """Store a raw match/v5 payload (or an already projected record); returns the record"""
+        record = match_data if isinstance(match_data, MatchRecord) else MatchRecord.from_match(match_data)
+        row = zlib.compress(json.dumps(record.to_row(), separators=(',', ':')).encode('utf-8'))
+        with self._lock:
+            self._remember(match_id, record)
+            self._index_players(record)
+            if self._db is not None:
+                cursor = self._db.execute(
+                    'INSERT OR IGNORE INTO match_records (match_id, record) VALUES (?, ?)', (match_id, row)
+                )
+                if cursor.rowcount:
+                    self._own_rowids.add(cursor.lastrowid)
+                self._db.commit()
+        for listener in self._listeners:
+            listener(record)
+        return record
+
+    def iter_records(self, batch_size=500):
+        """Yield every stored MatchRecord, reading SQLite in batches"""
+        if self._db is None:
+            with self._lock:
+                records = list(self._memory.values())
+            yield from records
+            return
+        last_rowid = 0
+        while True:
+            with self._lock:
+                if self._db is None:
+                    return
+                rows = self._db.execute(
+                    'SELECT rowid, record FROM match_records WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for last_rowid, blob in rows:
+                yield MatchRecord.from_row(json.loads(zlib.decompress(blob)))
+            # Decoding is CPU-bound; let other threads (greenlets under gevent) run
+            time.sleep(0)
+
+    def catch_up(self, batch_size=500):
+        """Pass rows other processes stored since the last call to the listeners; returns how many"""
+        caught_up = 0
+        while True:
+            with self._lock:
+                if self._db is None:
+                    return caught_up
+                rows = self._db.execute(
+                    'SELECT rowid, record FROM match_records WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (self._last_rowid, batch_size)
+                ).fetchall()
+                if rows:
+                    self._last_rowid = rows[-1][0]
+                    own = self._own_rowids
+                    self._own_rowids = {rowid for rowid in own if rowid > self._last_rowid}
+                    rows = [(rowid, blob) for rowid, blob in rows if rowid not in own]
+                else:
+                    return caught_up
+            for _, blob in rows:
+                record = MatchRecord.from_row(json.loads(zlib.decompress(blob)))
+                for listener in self._listeners:
+                    listener(record)
+            caught_up += len(rows)
+            time.sleep(0)
+
+    def _follow(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                caught_up = self.catch_up()
+            except Exception as e:
+                log_event('match_store_catch_up_failed', level=logging.WARNING, error=str(e))
+                continue
+            if caught_up:
+                log_event('match_store_caught_up', sample=1.0, records=caught_up)
+
+    def follow(self, interval=POLL_INTERVAL):
+        """Run ``catch_up`` every ``interval`` seconds in a background thread"""
+        if self._thread is None and self._db is not None and interval > 0:
+            self._thread = threading.Thread(target=self._follow, args=(interval,), daemon=True,
+                                            name='match-store-follow')
+            self._thread.start()
+
+    def player_match_ids(self, puuid, start=0, count=None):
+        """Stored match IDs for a player, newest first"""
+        with self._lock:
+            if self._db is None:
+                matches = self._players.get(puuid, {})
+                match_ids = sorted(matches, key=matches.get, reverse=True)
+                return match_ids[start:None if count is None else start + count]
+            rows = self._db.execute(
+                'SELECT match_id FROM match_players WHERE puuid = ? '
+                'ORDER BY game_end_timestamp DESC LIMIT ? OFFSET ?',
+                (puuid, -1 if count is None else count, start)
+            ).fetchall()
+            return [match_id for (match_id,) in rows]
+
+    def player_match_count(self, puuid):
+        with self._lock:
+            if self._db is None:
+                return len(self._players.get(puuid, {}))
+            return self._db.execute('SELECT COUNT(*) FROM match_players WHERE puuid = ?', (puuid,)).fetchone()[0]
+
+    def __contains__(self, match_id):
+        with self._lock:
+            if match_id in self._memory:
+                return True
+            if self._db is None:
+                return False
+            return self._db.execute('SELECT 1 FROM match_records WHERE match_id = ?', (match_id,)).fetchone() is not None
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
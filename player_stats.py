@@ -0,0 +1,168 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+# Upper bounds (minutes) of the game-length buckets; the last bucket is open-ended
+DURATION_BUCKETS = (20, 25, 30, 35)
+RECENT_FORM_WINDOWS = (5, 10, 20)
+# How many players keep live aggregates in memory
+MAX_TRACKED_PLAYERS = 5000
+
+
+def win_rate(wins, games):
+    return round(100 * wins / games, 1) if games else 0.0
+
+
+def kda_ratio(kills, deaths, assists):
+    return round((kills + assists) / max(deaths, 1), 2)
+
+
+def duration_bucket(game_duration):
+    minutes = game_duration / 60
+    for index, upper in enumerate(DURATION_BUCKETS):
+        if minutes < upper:
+            return index
+    return len(DURATION_BUCKETS)
+
+
+def duration_bucket_label(index):
+    if index == 0:
+        return f"<{DURATION_BUCKETS[0]}"
+    if index == len(DURATION_BUCKETS):
+        return f"{DURATION_BUCKETS[-1]}+"
+    return f"{DURATION_BUCKETS[index - 1]}-{DURATION_BUCKETS[index]}"
+
+
+class PlayerStats:
+    """Running aggregates for one player, updated one match at a time"""
+
+    __slots__ = ('puuid', 'match_ids', 'history', 'games', 'wins', 'kills', 'deaths', 'assists',
+                 'champions', 'buckets')
+
+    def __init__(self, puuid):
+        self.puuid = puuid
+        self.match_ids = set()
+        # (-game_end_timestamp, match_id, win) kept sorted, newest first
+        self.history = []
+        self.games = self.wins = self.kills = self.deaths = self.assists = 0
+        # champion -> [games, wins, kills, deaths, assists]
+        self.champions = {}
+        # per duration bucket: [games, wins]
+        self.buckets = [[0, 0] for _ in range(len(DURATION_BUCKETS) + 1)]
+
+    def add(self, record):
+        """Fold one MatchRecord into the aggregates; returns False if already counted"""
+        if record.match_id in self.match_ids:
+            return False
+        participant = record.participant(self.puuid)
+        if participant is None:
+            return False
+        self.match_ids.add(record.match_id)
+        win = participant.win
+        bisect.insort(self.history, (-record.game_end_timestamp, record.match_id, win))
+
+        self.games += 1
+        self.wins += win
+        self.kills += participant.kills
+        self.deaths += participant.deaths
+        self.assists += participant.assists
+
+        champion = self.champions.get(participant.champion_name)
+        if champion is None:
+            champion = self.champions[participant.champion_name] = [0, 0, 0, 0, 0]
+        champion[0] += 1
+        champion[1] += win
+        champion[2] += participant.kills
+        champion[3] += participant.deaths
+        champion[4] += participant.assists
+
+        bucket = self.buckets[duration_bucket(record.game_duration)]
+        bucket[0] += 1
+        bucket[1] += win
+        return True
+
+    def snapshot(self):
+        champions = [
+            {
+                'champion': name,
+                'games': games,
+                'wins': wins,
+                'winRate': win_rate(wins, games),
+                'avgKills': round(kills / games, 1),
+                'avgDeaths': round(deaths / games, 1),
+                'avgAssists': round(assists / games, 1),
+                'kda': kda_ratio(kills, deaths, assists),
+            }
+            for name, (games, wins, kills, deaths, assists) in self.champions.items()
+        ]
+        champions.sort(key=lambda champion: (-champion['games'], champion['champion']))
+
+        recent_form = {}
+        for window in RECENT_FORM_WINDOWS:
+            recent = self.history[:window]
+            wins = sum(1 for _, _, win in recent if win)
+            recent_form[f"last{window}"] = {'games': len(recent), 'wins': wins, 'winRate': win_rate(wins, len(recent))}
+
+        return {
+            'games': self.games,
+            'wins': self.wins,
+            'losses': self.games - self.wins,
+            'winRate': win_rate(self.wins, self.games),
+            'kda': {
+                'kills': round(self.kills / self.games, 1) if self.games else 0,
+                'deaths': round(self.deaths / self.games, 1) if self.games else 0,
+                'assists': round(self.assists / self.games, 1) if self.games else 0,
+                'ratio': kda_ratio(self.kills, self.deaths, self.assists),
+            },
+            'champions': champions,
+            'recentForm': recent_form,
+            'durationBuckets': [
+                {'bucket': duration_bucket_label(index), 'games': games, 'wins': wins, 'winRate': win_rate(wins, games)}
+                for index, (games, wins) in enumerate(self.buckets)
+            ],
+        }
+
+
+class StatsEngine:
+    """Keeps incremental aggregates for tracked players.
+
+    ``track`` builds a player's aggregates once from everything already in
+    the match store; after that each newly stored match is folded in by
+    the store listener without recomputing anything. Matches other processes
+    store arrive through the same listener (MatchStore.catch_up); PlayerStats
+    skips any match it has already counted.
+    """
+
+    def __init__(self, match_store, max_players=MAX_TRACKED_PLAYERS):
+        self.match_store = match_store
+        self.max_players = max_players
+        self._players = OrderedDict()
+        self._lock = threading.Lock()
+        match_store.add_listener(self.ingest)
+
+    def track(self, puuid):
+        with self._lock:
+            stats = self._players.get(puuid)
+            if stats is not None:
+                self._players.move_to_end(puuid)
+                return stats
+            stats = self._players[puuid] = PlayerStats(puuid)
+            while len(self._players) > self.max_players:
+                self._players.popitem(last=False)
+            for match_id in self.match_store.player_match_ids(puuid):
+                record = self.match_store.get(match_id)
+                if record is not None:
+                    stats.add(record)
+            return stats
+
+    def ingest(self, record):
+        with self._lock:
+            for puuid in record.puuids:
+                stats = self._players.get(puuid)
+                if stats is not None:
+                    stats.add(record)
+
+    def snapshot(self, puuid):
+        stats = self.track(puuid)
+        with self._lock:
+            return stats.snapshot()
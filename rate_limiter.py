@@ -0,0 +1,204 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+# Priority lanes - lower value is served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Limits assumed for a host before Riot has told us the real ones (dev key defaults)
+DEFAULT_APP_LIMITS = os.getenv('RIOT_APP_RATE_LIMIT', '20:1,100:120')
+
+# Share of each application window the background lane may use, so that
+# interactive requests always have budget left
+BACKGROUND_SHARE = float(os.getenv('RIOT_BACKGROUND_SHARE', '0.5'))
+
+# Path segments that are part of a method's identity rather than an argument
+STATIC_SEGMENTS = {'ids', 'timeline'}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request cannot be scheduled within its allowed wait"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Riot API rate limit reached, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def parse_limits(header_value):
+    """Parse a Riot limit header such as ``20:1,100:120`` into (count, seconds) pairs"""
+    pairs = []
+    for part in (header_value or '').split(','):
+        if ':' in part:
+            count, seconds = part.split(':', 1)
+            pairs.append((int(count), int(seconds)))
+    return pairs
+
+
+def method_key(url):
+    """Return (host, method) for a Riot URL, with path arguments stripped.
+
+    ``/lol/match/v5/matches/EUW1_1`` and ``/lol/match/v5/matches/EUW1_2`` share
+    one method limit, as do all ``by-puuid/{puuid}`` lookups of an endpoint.
+    """
+    parts = urlsplit(url)
+    segments = parts.path.strip('/').split('/')
+    method = segments[:4] + [
+        segment if segment.startswith('by-') or segment in STATIC_SEGMENTS else '{}'
+        for segment in segments[4:]
+    ]
+    return parts.netloc, '/' + '/'.join(method)
+
+
+class RateWindow:
+    """Sliding window of request timestamps for one ``count:seconds`` limit"""
+
+    def __init__(self, limit, seconds):
+        self.limit = limit
+        self.seconds = seconds
+        self.timestamps = deque()
+
+    def purge(self, now):
+        while self.timestamps and self.timestamps[0] <= now - self.seconds:
+            self.timestamps.popleft()
+
+    def delay(self, now, share=1.0):
+        self.purge(now)
+        limit = max(1, int(self.limit * share))
+        if len(self.timestamps) < limit:
+            return 0.0
+        # The request that has to age out before another one fits
+        return self.timestamps[len(self.timestamps) - limit] + self.seconds - now
+
+
+class RateBucket:
+    """All limit windows sharing one budget (an app key on a host, or a method)"""
+
+    def __init__(self, limits=()):
+        self.windows = {}
+        self.blocked_until = 0.0
+        self.set_limits(limits)
+
+    def set_limits(self, limits):
+        for limit, seconds in limits:
+            window = self.windows.get(seconds)
+            if window is None:
+                self.windows[seconds] = RateWindow(limit, seconds)
+            else:
+                window.limit = limit
+
+    def sync_counts(self, counts, now):
+        """Adopt Riot's view of the window counts when it has seen more requests than we have"""
+        for count, seconds in counts:
+            window = self.windows.get(seconds)
+            if window is None:
+                continue
+            window.purge(now)
+            for _ in range(count - len(window.timestamps)):
+                window.timestamps.append(now)
+
+    def delay(self, now, share=1.0):
+        delay = max(0.0, self.blocked_until - now)
+        for window in self.windows.values():
+            delay = max(delay, window.delay(now, share))
+        return delay
+
+    def record(self, now):
+        for window in self.windows.values():
+            window.timestamps.append(now)
+
+    def block(self, until):
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class RateLimiter:
+    """Schedules Riot API requests against the app and method rate limits.
+
+    Requests wait in a priority queue per host instead of bursting; the best
+    placed request whose app and method buckets both have room goes first.
+    Limits and counts are learned from the ``X-App-Rate-Limit`` and
+    ``X-Method-Rate-Limit`` headers, and a 429 blocks the offending bucket
+    for ``Retry-After`` seconds.
+    """
+
+    def __init__(self, app_limits=DEFAULT_APP_LIMITS, background_share=BACKGROUND_SHARE):
+        self.default_app_limits = parse_limits(app_limits)
+        self.background_share = background_share
+        self._app = {}
+        self._methods = {}
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+    def _buckets(self, host, method):
+        app = self._app.get(host)
+        if app is None:
+            app = self._app[host] = RateBucket(self.default_app_limits)
+        bucket = self._methods.get((host, method))
+        if bucket is None:
+            bucket = self._methods[(host, method)] = RateBucket()
+        return app, bucket
+
+    def _delay(self, waiter, now):
+        priority, _, host, method = waiter
+        app, bucket = self._buckets(host, method)
+        share = self.background_share if priority >= BACKGROUND else 1.0
+        return max(app.delay(now, share), bucket.delay(now))
+
+    def _next_eligible(self, host, now):
+        for waiter in sorted(self._waiters):
+            if waiter[2] == host and self._delay(waiter, now) <= 0:
+                return waiter
+        return None
+
+    def acquire(self, url, priority=INTERACTIVE, max_wait=None):
+        """Block until ``url`` may be requested, or raise RateLimitExceeded after ``max_wait`` seconds"""
+        host, method = method_key(url)
+        waiter = (priority, next(self._sequence), host, method)
+        with self._cond:
+            self._waiters.append(waiter)
+            deadline = None if max_wait is None else time.monotonic() + max_wait
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._next_eligible(host, now) == waiter:
+                        app, bucket = self._buckets(host, method)
+                        app.record(now)
+                        bucket.record(now)
+                        return
+                    # Either our bucket is full or a better placed request goes first
+                    wait = self._delay(waiter, now) or 0.05
+                    if deadline is not None:
+                        if now + wait > deadline:
+                            raise RateLimitExceeded(wait)
+                        wait = min(wait, deadline - now)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(waiter)
+                self._cond.notify_all()
+
+    def update(self, url, response):
+        """Learn limits from a response and back off on 429"""
+        host, method = method_key(url)
+        headers = response.headers
+        with self._cond:
+            now = time.monotonic()
+            app, bucket = self._buckets(host, method)
+            if 'X-App-Rate-Limit' in headers:
+                app.set_limits(parse_limits(headers['X-App-Rate-Limit']))
+                app.sync_counts(parse_limits(headers.get('X-App-Rate-Limit-Count')), now)
+            if 'X-Method-Rate-Limit' in headers:
+                bucket.set_limits(parse_limits(headers['X-Method-Rate-Limit']))
+                bucket.sync_counts(parse_limits(headers.get('X-Method-Rate-Limit-Count')), now)
+
+            if response.status_code == 429:
+                retry_after = float(headers.get('Retry-After', 1))
+                if headers.get('X-Rate-Limit-Type') == 'application':
+                    app.block(now + retry_after)
+                else:
+                    # Method limits and service-side throttling only affect this endpoint
+                    bucket.block(now + retry_after)
+            self._cond.notify_all()
@@ -0,0 +1,79 @@
+import os
+
+# Platform routing value -> regional cluster that serves its match-v5 data
+PLATFORMS = {
+    'br1': 'americas', 'la1': 'americas', 'la2': 'americas', 'na1': 'americas',
+    'eun1': 'europe', 'euw1': 'europe', 'me1': 'europe', 'ru': 'europe', 'tr1': 'europe',
+    'jp1': 'asia', 'kr': 'asia',
+    'oc1': 'sea', 'ph2': 'sea', 'sg2': 'sea', 'th2': 'sea', 'tw2': 'sea', 'vn2': 'sea',
+}
+# Server names players use (and the usual default Riot ID tags) -> platform
+ALIASES = {
+    'br': 'br1', 'lan': 'la1', 'las': 'la2', 'na': 'na1',
+    'eune': 'eun1', 'euw': 'euw1', 'me': 'me1', 'tr': 'tr1',
+    'jp': 'jp1', 'kr1': 'kr', 'oce': 'oc1',
+    'ph': 'ph2', 'sg': 'sg2', 'th': 'th2', 'tw': 'tw2', 'vn': 'vn2',
+}
+# account-v1 is only served by these clusters; the others use the nearest one
+ACCOUNT_CLUSTERS = {'americas': 'americas', 'asia': 'asia', 'europe': 'europe', 'sea': 'asia'}
+# Platform used when neither the request nor the player's account names one
+DEFAULT_PLATFORM = os.getenv('RIOT_PLATFORM', 'euw1')
+# Host templates; a URL without the placeholder sends every region to one
+# host (e.g. the stand-in server in benchmarks/)
+PLATFORM_URL = os.getenv('RIOT_BASE_URL', 'https://{platform}.api.riotgames.com')
+REGIONAL_URL = os.getenv('RIOT_REGIONAL_URL', 'https://{cluster}.api.riotgames.com')
+
+
+class UnknownRegion(ValueError):
+    """Raised for a region name that is neither a platform nor a known alias"""
+
+    def __init__(self, name):
+        super().__init__(f"Unknown region: {name}")
+        self.name = name
+
+
+def platform_for(name):
+    """Platform routing value for a platform or alias (case-insensitive), or None"""
+    key = (name or '').strip().lower()
+    if key in PLATFORMS:
+        return key
+    return ALIASES.get(key)
+
+
+class Region:
+    """Base URLs for one platform and the regional cluster it belongs to.
+
+    The Riot client keeps a connection pool and a rate limiter per host, so
+    every platform and every cluster draws on its own budget.
+    """
+
+    __slots__ = ('platform', 'cluster', 'platform_url', 'regional_url', 'account_url')
+
+    def __init__(self, platform, platform_url=PLATFORM_URL, regional_url=REGIONAL_URL):
+        self.platform = platform
+        self.cluster = PLATFORMS[platform]
+        self.platform_url = platform_url.format(platform=platform)
+        self.regional_url = regional_url.format(cluster=self.cluster)
+        self.account_url = regional_url.format(cluster=ACCOUNT_CLUSTERS[self.cluster])
+
+    def __repr__(self):
+        return f"Region({self.platform!r})"
+
+
+REGIONS = {platform: Region(platform) for platform in PLATFORMS}
+
+
+def get_region(name=None):
+    """Region for a platform or alias; the default region when ``name`` is empty"""
+    if not name:
+        return REGIONS[DEFAULT_PLATFORM]
+    platform = platform_for(name)
+    if platform is None:
+        raise UnknownRegion(name)
+    return REGIONS[platform]
+
+
+def region_for_match(match_id):
+    """Region a match ID such as ``EUN1_3456789`` was played on (default when unrecognised)"""
+    platform = platform_for(match_id.split('_', 1)[0])
+    return REGIONS[platform] if platform else REGIONS[DEFAULT_PLATFORM]
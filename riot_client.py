@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import INTERACTIVE, RateLimiter, RateLimitExceeded, method_key
+from single_flight import SingleFlight
+from telemetry import log_event
+
+# (connect, read) timeouts in seconds for every upstream call
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# Keep-alive connections kept open per host
+DEFAULT_POOL_SIZE = int(os.getenv('RIOT_POOL_SIZE', '20'))
+
+# Longest an interactive request may queue for rate-limit budget, in seconds
+DEFAULT_MAX_WAIT = 10
+
+# How many times a request is re-queued after a 429 before giving up
+DEFAULT_429_RETRIES = 2
+
+# Transient server errors, retried through the rate limiter with backoff
+RETRY_STATUSES = (500, 502, 503, 504)
+# The first 5xx retry is immediate; later ones wait this long, doubling each time
+SERVER_ERROR_BACKOFF = 0.3
+
+
+class RiotClient:
+    """Shared HTTP client for the Riot API.
+
+    Keeps one pooled keep-alive session per host (euw1, europe, ...) so that
+    handlers reuse TCP/TLS connections instead of handshaking on every call.
+    Every request is scheduled through its host's own RateLimiter, since
+    Riot enforces limits per platform and regional cluster. A 429 re-queues
+    the request behind the ``Retry-After`` backoff and transient 5xx
+    responses are retried with backoff, each a limited number of times and
+    each attempt through the limiter again. Only failed connects are retried
+    inside the session, as they never reach Riot.
+    Identical GETs that are in flight at the same time share one upstream call.
+    Latency and status of every call go to ``metrics`` when one is given.
+    """
+
+    def __init__(self, api_key, timeout=DEFAULT_TIMEOUT, pool_size=DEFAULT_POOL_SIZE, retries=2,
+                 limiter_factory=RateLimiter, max_wait=DEFAULT_MAX_WAIT, max_429_retries=DEFAULT_429_RETRIES, metrics=None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = retries
+        self.limiter_factory = limiter_factory
+        self.max_wait = max_wait
+        self.max_429_retries = max_429_retries
+        self.metrics = metrics
+        self._sessions = {}
+        self._limiters = {}
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def _build_session(self):
+        # Anything that may have reached Riot is retried in _get instead,
+        # where the rate limiter sees every attempt
+        retry = Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.3,
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({'X-Riot-Token': self.api_key})
+        return session
+
+    def _for_host(self, registry, url, factory):
+        host = urlsplit(url).netloc
+        value = registry.get(host)
+        if value is None:
+            with self._lock:
+                value = registry.get(host)
+                if value is None:
+                    value = registry[host] = factory()
+        return value
+
+    def session_for(self, url):
+        """Return the pooled session for the host of ``url``"""
+        return self._for_host(self._sessions, url, self._build_session)
+
+    def limiter_for(self, url):
+        """Return the rate limiter for the host of ``url``"""
+        return self._for_host(self._limiters, url, self.limiter_factory)
+
+    def get(self, url, params=None, timeout=None, priority=INTERACTIVE):
+        """GET a Riot URL once the rate limiter allows it.
+
+        Interactive requests raise RateLimitExceeded if they would queue for
+        longer than ``max_wait``; background requests wait as long as needed.
+        """
+        key = (url, tuple(sorted(params.items())) if params else None)
+        return self._flights.do(key, self._get, url, params, timeout, priority)
+
+    def _get(self, url, params, timeout, priority):
+        max_wait = self.max_wait if priority == INTERACTIVE else None
+        session = self.session_for(url)
+        limiter = self.limiter_for(url)
+        throttled = failed = 0
+        host, path = method_key(url)
+        endpoint = host + path
+        while True:
+            try:
+                limiter.acquire(url, priority=priority, max_wait=max_wait)
+            except RateLimitExceeded:
+                if self.metrics:
+                    self.metrics.inc('upstream_throttled_total', service='riot', endpoint=endpoint)
+                raise
+            started = time.perf_counter()
+            try:
+                response = session.get(url, params=params, timeout=timeout or self.timeout)
+            except requests.RequestException as e:
+                self._record(endpoint, 'error', started)
+                log_event('upstream_error', level=logging.WARNING, service='riot', endpoint=endpoint, error=str(e))
+                raise
+            self._record(endpoint, response.status_code, started)
+            limiter.update(url, response)
+            if response.status_code == 429 and throttled < self.max_429_retries:
+                throttled += 1
+                continue
+            if response.status_code in RETRY_STATUSES and failed < self.retries:
+                if failed:
+                    time.sleep(SERVER_ERROR_BACKOFF * 2 ** (failed - 1))
+                failed += 1
+                continue
+            return response
+
+    def _record(self, endpoint, status, started):
+        seconds = time.perf_counter() - started
+        if self.metrics:
+            self.metrics.upstream('riot', endpoint, status, seconds)
+        log_event('upstream', service='riot', endpoint=endpoint, status=status, ms=round(seconds * 1000, 1))
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,137 @@
+import logging
+import os
+import threading
+import time
+
+from rate_limiter import RateLimitExceeded
+from telemetry import log_event
+
+# A 403 means the key lacks access to that endpoint; re-probe rarely
+FORBIDDEN_COOLDOWN = int(os.getenv('SPECTATOR_FORBIDDEN_COOLDOWN', '3600'))
+# Server errors and timeouts are usually transient
+FAILURE_COOLDOWN = int(os.getenv('SPECTATOR_FAILURE_COOLDOWN', '60'))
+# Consecutive server errors before an endpoint is skipped
+FAILURE_THRESHOLD = int(os.getenv('SPECTATOR_FAILURE_THRESHOLD', '3'))
+# A half-open probe that never reported back is replaced after this long
+PROBE_TIMEOUT = 30
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Closed -> open on failure -> half-open single probe after the cooldown"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD):
+        self.failure_threshold = failure_threshold
+        self.state = CLOSED
+        self.failures = 0
+        self.reason = None
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may go through; past the cooldown only one probe is let through"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if now < self._open_until:
+                return False
+            self.state = HALF_OPEN
+            self._open_until = now + PROBE_TIMEOUT
+            return True
+
+    def success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.reason = None
+
+    def failure(self, reason, cooldown=FAILURE_COOLDOWN, trip=False):
+        with self._lock:
+            self.failures += 1
+            self.reason = reason
+            if trip or self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._open_until = time.monotonic() + cooldown
+
+    def status(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'reason': self.reason,
+                'retryIn': max(0, round(self._open_until - time.monotonic())) if self.state == OPEN else 0,
+            }
+
+
+class SpectatorRouter:
+    """Remembers which spectator endpoint variant works for this API key.
+
+    Variants are ``(name, url_template, identifier)`` where the identifier
+    is ``'summoner_id'`` or ``'puuid'``. The last variant that answered is
+    tried first; variants that returned 403 or keep failing sit behind an
+    open circuit breaker until a half-open probe succeeds.
+    """
+
+    def __init__(self, riot, variants):
+        self.riot = riot
+        self.variants = variants
+        self.breakers = {name: CircuitBreaker() for name, _, _ in variants}
+        self.preferred = None
+
+    def _ordered(self):
+        preferred = self.preferred
+        return sorted(self.variants, key=lambda variant: variant[0] != preferred)
+
+    def fetch(self, puuid, summoner_id=None):
+        """Spectator response (200 or 404) from the first working variant.
+
+        Returns the last failed response when every tried variant failed
+        with a server error, or None when all of them are forbidden or
+        switched off, which means the caller should use its fallback.
+        A 429 that outlasted the client's retries is raised as
+        RateLimitExceeded; being throttled says nothing about the endpoint,
+        so it never counts against a breaker.
+        """
+        identifiers = {'puuid': puuid, 'summoner_id': summoner_id}
+        failed_response = None
+        for name, url_template, identifier in self._ordered():
+            if not identifiers[identifier]:
+                continue
+            breaker = self.breakers[name]
+            if not breaker.allow():
+                continue
+            try:
+                response = self.riot.get(url_template.format(**{identifier: identifiers[identifier]}))
+            except RateLimitExceeded:
+                raise
+            except Exception as e:
+                log_event('spectator_error', level=logging.WARNING, endpoint=name, error=str(e))
+                breaker.failure(str(e))
+                continue
+
+            if response.status_code in (200, 404):
+                breaker.success()
+                self.preferred = name
+                return response
+            if response.status_code == 429:
+                raise RateLimitExceeded(float(response.headers.get('Retry-After', 1)))
+            log_event('spectator_status', level=logging.WARNING, endpoint=name, status=response.status_code)
+            if response.status_code == 403:
+                breaker.failure('forbidden', cooldown=FORBIDDEN_COOLDOWN, trip=True)
+            elif response.status_code >= 500:
+                breaker.failure(f"HTTP {response.status_code}")
+                failed_response = response
+            else:
+                # Other client errors concern this request, not the endpoint
+                return response
+        return failed_response
+
+    def status(self):
+        return {
+            'preferred': self.preferred,
+            'endpoints': {name: breaker.status() for name, breaker in self.breakers.items()},
+        }
@@ -17,8 +17,10 @@ function searchSummoner() {
     // Add to recent searches
     addToRecentSearches(riotId);
     
-    // Redirect to summoner profile
-    window.location.href = `/summoner/${encodeURIComponent(riotId)}`;
+    // Redirect to summoner profile; without a region the server detects the player's own
+    const regionSelect = document.getElementById('regionSelect');
+    const region = regionSelect ? regionSelect.value : '';
+    window.location.href = `/summoner/${encodeURIComponent(riotId)}` + (region ? `?region=${region}` : '');
 }
 
 function searchSpecific(riotId) {
@@ -50,13 +52,14 @@ function updateRecentSearchesUI() {
 }
 
 // Load summoner data
-async function loadSummonerData(riotId) {
+async function loadSummonerData(riotId, region) {
     const profileHeader = document.getElementById('profileHeader');
     const profileContent = document.getElementById('profileContent');
     const errorMessage = document.getElementById('errorMessage');
     
     try {
-        const response = await fetch(`/api/summoner/${encodeURIComponent(riotId)}`);
+        const query = region ? `?region=${encodeURIComponent(region)}` : '';
+        const response = await fetch(`/api/summoner/${encodeURIComponent(riotId)}${query}`);
         const data = await response.json();
         
         if (!response.ok) {
@@ -67,7 +70,7 @@ async function loadSummonerData(riotId) {
         if (profileHeader) {
             profileHeader.innerHTML = `
                 <div class="summoner-info">
-                    <img src="https://ddragon.leagueoflegends.com/cdn/13.24.1/img/profileicon/${data.summoner.profileIconId}.png" 
+                    <img src="${data.summoner.profileIconUrl}" 
                          alt="Profile Icon" class="summoner-avatar">
                     <div class="summoner-details">
                         <h1>${data.summoner.gameName}<span class="tag-line">#${data.summoner.tagLine}</span></h1>
@@ -115,7 +118,7 @@ async function loadSummonerData(riotId) {
         if (matchesList && data.recentMatches) {
             matchesList.innerHTML = data.recentMatches.map(match => `
                 <div class="match-item">
-                    <img src="https://ddragon.leagueoflegends.com/cdn/13.24.1/img/champion/${match.champion}.png" 
+                    <img src="${match.championIcon}" 
                          alt="${match.champion}" class="match-champion">
                     <div class="match-details">
                         <div class="match-champion-name">${match.champion}</div>
@@ -163,35 +166,28 @@ async function requestAIAnalysis() {
     analyzeBtn.disabled = true;
     analyzeBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Analizuję...';
     
+    const requestBody = JSON.stringify({
+        summoner_name: window.currentSummonerData.summoner.riotId,
+        match_history: window.currentSummonerData.recentMatches
+    });
+    
     try {
-        const response = await fetch('/api/analyze-performance', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                summoner_name: window.currentSummonerData.summoner.riotId,
-                match_history: window.currentSummonerData.recentMatches
-            })
-        });
-        
-        // Check if response is JSON
-        const contentType = response.headers.get('content-type');
-        if (!contentType || !contentType.includes('application/json')) {
-            const textResponse = await response.text();
-            console.error('Non-JSON response:', textResponse);
-            throw new Error('Serwer zwrócił nieprawidłową odpowiedź');
+        let streamed = false;
+        try {
+            streamed = await streamAIAnalysis(requestBody, analysisResult);
+        } catch (error) {
+            // Only fall back when nothing was rendered yet
+            if (analysisResult.textContent) {
+                throw error;
+            }
+            console.warn('Streaming analysis failed, falling back to job polling:', error);
         }
         
-        const data = await response.json();
-        
-        if (!response.ok) {
-            throw new Error(data.error || 'Wystąpił błąd podczas analizy');
+        if (!streamed) {
+            analysisResult.textContent = await pollAIAnalysis(requestBody);
+            analysisResult.style.display = 'block';
         }
         
-        analysisResult.textContent = data.analysis;
-        analysisResult.style.display = 'block';
-        
         // Scroll to results
         analysisResult.scrollIntoView({ behavior: 'smooth' });
         
@@ -204,6 +200,109 @@ async function requestAIAnalysis() {
     }
 }
 
+// Render the analysis token by token from the SSE endpoint.
+// Returns false when the browser cannot read streamed responses.
+async function streamAIAnalysis(requestBody, analysisResult) {
+    const response = await fetch('/api/analyze-performance/stream', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        },
+        body: requestBody
+    });
+    
+    if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.error || 'Wystąpił błąd podczas analizy');
+    }
+    if (!response.body || !response.body.getReader) {
+        return false;
+    }
+    
+    analysisResult.textContent = '';
+    analysisResult.style.display = 'block';
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) {
+            return true;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        
+        // SSE messages are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            
+            let event = 'message';
+            let data = '';
+            message.split('\n').forEach(line => {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    data += line.slice(5).trim();
+                }
+            });
+            const payload = data ? JSON.parse(data) : {};
+            
+            if (event === 'error') {
+                throw new Error(payload.error || 'Wystąpił błąd podczas analizy');
+            }
+            if (event === 'done') {
+                return true;
+            }
+            if (payload.delta) {
+                analysisResult.textContent += payload.delta;
+            }
+        }
+    }
+}
+
+// Submit a background analysis job and long-poll it until it finishes
+async function pollAIAnalysis(requestBody) {
+    const response = await fetch('/api/analyze-performance/jobs', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: requestBody
+    });
+    
+    // Check if response is JSON
+    const contentType = response.headers.get('content-type');
+    if (!contentType || !contentType.includes('application/json')) {
+        const textResponse = await response.text();
+        console.error('Non-JSON response:', textResponse);
+        throw new Error('Serwer zwrócił nieprawidłową odpowiedź');
+    }
+    
+    let data = await response.json();
+    
+    if (!response.ok) {
+        throw new Error(data.error || 'Wystąpił błąd podczas analizy');
+    }
+    
+    while (data.status === 'queued' || data.status === 'running') {
+        const jobResponse = await fetch(`${data.status_url}?wait=10`);
+        const job = await jobResponse.json();
+        if (!jobResponse.ok) {
+            throw new Error(job.error || 'Wystąpił błąd podczas analizy');
+        }
+        data = { ...job, status_url: data.status_url };
+    }
+    
+    if (data.status === 'error') {
+        throw new Error(data.error || 'Wystąpił błąd podczas analizy');
+    }
+    return data.analysis;
+}
+
 // Utility functions
 function showNotification(message, type = 'info') {
     // Create notification element
@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+
+import requests
+
+from telemetry import log_event
+
+DDRAGON_CDN = "https://ddragon.leagueoflegends.com"
+# Root of the local Data Dragon snapshot: <root>/<version>/data/<language>/*.json
+DDRAGON_PATH = os.getenv('DDRAGON_PATH', os.path.join('data', 'ddragon'))
+DDRAGON_LANGUAGE = os.getenv('DDRAGON_LANGUAGE', 'en_US')
+# Pin a patch version; by default the newest snapshot on disk is used
+DDRAGON_VERSION = os.getenv('DDRAGON_VERSION')
+# Download a snapshot at startup when none is on disk (deployments fetch one at build time)
+DDRAGON_DOWNLOAD = os.getenv('DDRAGON_DOWNLOAD', '1') == '1'
+# Version assumed for asset URLs when no snapshot is available
+FALLBACK_VERSION = '13.24.1'
+
+# Built-in names used until a Data Dragon snapshot is installed
+FALLBACK_CHAMPIONS = {
+    1: "Annie", 2: "Olaf", 3: "Galio", 4: "Twisted Fate", 5: "Xin Zhao",
+    6: "Urgot", 7: "LeBlanc", 8: "Vladimir", 9: "Fiddlesticks", 10: "Kayle",
+    11: "Master Yi", 12: "Alistar", 13: "Ryze", 14: "Sion", 15: "Sivir",
+    16: "Soraka", 17: "Teemo", 18: "Tristana", 19: "Warwick", 20: "Nunu",
+    21: "Miss Fortune", 22: "Ashe", 23: "Tryndamere", 24: "Jax", 25: "Morgana",
+    26: "Zilean", 27: "Singed", 28: "Evelynn", 29: "Twitch", 30: "Karthus",
+    31: "Cho'Gath", 32: "Amumu", 33: "Rammus", 34: "Anivia", 35: "Shaco",
+    36: "Dr. Mundo", 37: "Sona", 38: "Kassadin", 39: "Irelia", 40: "Janna",
+    41: "Gangplank", 42: "Corki", 43: "Karma", 44: "Taric", 45: "Veigar",
+    48: "Trundle", 50: "Swain", 51: "Caitlyn", 53: "Blitzcrank", 54: "Malphite",
+    55: "Katarina", 56: "Nocturne", 57: "Maokai", 58: "Renekton", 59: "Jarvan IV",
+    60: "Elise", 61: "Orianna", 62: "Wukong", 63: "Brand", 64: "Lee Sin",
+    67: "Vayne", 68: "Rumble", 69: "Cassiopeia", 72: "Skarner", 74: "Heimerdinger",
+    75: "Nasus", 76: "Nidalee", 77: "Udyr", 78: "Poppy", 79: "Gragas",
+    80: "Pantheon", 81: "Ezreal", 82: "Mordekaiser", 83: "Yorick", 84: "Akali",
+    85: "Kennen", 86: "Garen", 89: "Leona", 90: "Malzahar", 91: "Talon",
+    92: "Riven", 96: "Kog'Maw", 98: "Shen", 99: "Lux", 101: "Xerath",
+    102: "Shyvana", 103: "Ahri", 104: "Graves", 105: "Fizz", 106: "Volibear",
+    107: "Rengar", 110: "Varus", 111: "Nautilus", 112: "Viktor", 113: "Sejuani",
+    114: "Fiora", 115: "Ziggs", 117: "Lulu", 119: "Draven", 120: "Hecarim",
+    121: "Kha'Zix", 122: "Darius", 126: "Jayce", 127: "Lissandra", 131: "Diana",
+    133: "Quinn", 134: "Syndra", 136: "Aurelion Sol", 141: "Kayn", 142: "Zoe",
+    143: "Zyra", 145: "Kai'Sa", 147: "Seraphine", 150: "Gnar", 154: "Zac",
+    157: "Yasuo", 161: "Vel'Koz", 163: "Taliyah", 164: "Camille", 166: "Akshan",
+    200: "Bel'Veth", 201: "Braum", 202: "Jhin", 203: "Kindred", 221: "Zeri",
+    222: "Jinx", 223: "Tahm Kench", 234: "Viego", 235: "Senna", 236: "Lucian",
+    238: "Zed", 240: "Kled", 245: "Ekko", 246: "Qiyana", 254: "Vi",
+    266: "Aatrox", 267: "Nami", 268: "Azir", 350: "Yuumi", 360: "Samira",
+    412: "Thresh", 420: "Illaoi", 421: "Rek'Sai", 427: "Ivern", 429: "Kalista",
+    432: "Bard", 516: "Ornn", 517: "Sylas", 518: "Neeko", 523: "Aphelios",
+    526: "Rell", 555: "Pyke", 777: "Yone", 875: "Sett", 876: "Lillia",
+    887: "Gwen", 888: "Renata Glasc", 895: "Nilah", 897: "K'Sante", 901: "Smolder",
+    902: "Aurora", 950: "Naafiri", 910: "Hwei"
+}
+
+# Data Dragon asset keys that can't be derived from the display name
+FALLBACK_CHAMPION_KEYS = {
+    62: "MonkeyKing", 7: "Leblanc", 20: "Nunu", 31: "Chogath", 96: "KogMaw", 121: "Khazix",
+    145: "Kaisa", 161: "Velkoz", 200: "Belveth", 421: "RekSai", 888: "Renata",
+}
+
+FALLBACK_SPELLS = {
+    1: ("SummonerBoost", "Cleanse"), 3: ("SummonerExhaust", "Exhaust"), 4: ("SummonerFlash", "Flash"),
+    6: ("SummonerHaste", "Ghost"), 7: ("SummonerHeal", "Heal"), 11: ("SummonerSmite", "Smite"),
+    12: ("SummonerTeleport", "Teleport"), 13: ("SummonerMana", "Clarity"), 14: ("SummonerDot", "Ignite"),
+    21: ("SummonerBarrier", "Barrier"), 32: ("SummonerSnowball", "Mark"),
+}
+
+
+def version_sort_key(version):
+    return [int(part) if part.isdigit() else 0 for part in version.split('.')]
+
+
+class StaticDataIndex:
+    """Immutable lookup tables for one Data Dragon patch version"""
+
+    def __init__(self, version, champions, spells, profile_icons):
+        self.version = version
+        self.champions = champions
+        self.spells = spells
+        self.profile_icons = profile_icons
+
+    @classmethod
+    def from_snapshot(cls, root, version, language=DDRAGON_LANGUAGE):
+        data_dir = os.path.join(root, version, 'data', language)
+
+        def read(name):
+            with open(os.path.join(data_dir, name), encoding='utf-8') as f:
+                return json.load(f)['data']
+
+        champions = {
+            int(entry['key']): {'key': entry['id'], 'name': entry['name'], 'image': entry['image']['full']}
+            for entry in read('champion.json').values()
+        }
+        spells = {
+            int(entry['key']): {'key': entry['id'], 'name': entry['name'], 'image': entry['image']['full']}
+            for entry in read('summoner.json').values()
+            if str(entry.get('key', '')).isdigit()
+        }
+        profile_icons = frozenset(int(entry['id']) for entry in read('profileicon.json').values())
+        return cls(version, champions, spells, profile_icons)
+
+    @classmethod
+    def fallback(cls):
+        champions = {}
+        for champion_id, name in FALLBACK_CHAMPIONS.items():
+            key = FALLBACK_CHAMPION_KEYS.get(champion_id) or re.sub(r"[^A-Za-z]", "", name)
+            champions[champion_id] = {'key': key, 'name': name, 'image': f"{key}.png"}
+        spells = {
+            spell_id: {'key': key, 'name': name, 'image': f"{key}.png"}
+            for spell_id, (key, name) in FALLBACK_SPELLS.items()
+        }
+        return cls(FALLBACK_VERSION, champions, spells, frozenset())
+
+    def champion(self, champion_id):
+        champion = self.champions.get(champion_id)
+        if champion is None:
+            return {'key': None, 'name': f"Champion {champion_id}", 'image': None}
+        return champion
+
+    def asset_base_url(self):
+        return f"{DDRAGON_CDN}/cdn/{self.version}/img/"
+
+    def cdn_url(self, kind, image):
+        return f"{self.asset_base_url()}{kind}/{image}" if image else None
+
+    def champion_icon(self, champion_id):
+        return self.cdn_url('champion', self.champion(champion_id)['image'])
+
+    def spell_icon(self, spell_id):
+        spell = self.spells.get(spell_id)
+        return self.cdn_url('spell', spell['image']) if spell else None
+
+    def profile_icon(self, icon_id):
+        # Unknown icons (newer than the snapshot) still get a best-effort URL
+        return self.cdn_url('profileicon', f"{icon_id}.png")
+
+
+class StaticData:
+    """Holds the active StaticDataIndex and swaps it atomically on reload.
+
+    Lookups read ``self.index`` once, so a reload to a new patch never
+    exposes a half-built table and needs no restart. Each process holds its
+    own index: a reload only switches the process that handles it.
+    """
+
+    def __init__(self, root=DDRAGON_PATH, language=DDRAGON_LANGUAGE):
+        self.root = root
+        self.language = language
+        self.index = StaticDataIndex.fallback()
+        self._lock = threading.Lock()
+
+    def available_versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        versions = [
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, 'data', self.language, 'champion.json'))
+        ]
+        return sorted(versions, key=version_sort_key)
+
+    def load(self, version=None):
+        """Load ``version`` (default: pinned or newest on disk) and make it active"""
+        with self._lock:
+            versions = self.available_versions()
+            version = version or DDRAGON_VERSION or (versions[-1] if versions else None)
+            if version is None or version not in versions:
+                log_event('static_data_missing', level=logging.WARNING, version=version, root=self.root)
+                return self.index
+            self.index = StaticDataIndex.from_snapshot(self.root, version, self.language)
+            log_event('static_data_loaded', sample=1.0, version=version, champions=len(self.index.champions))
+            return self.index
+
+    def _download_and_load(self):
+        try:
+            version = download_snapshot(DDRAGON_VERSION, self.root, self.language)
+        except Exception as e:
+            log_event('static_data_download_failed', level=logging.WARNING, error=str(e))
+            return
+        self.load(version)
+
+    def start(self, download=DDRAGON_DOWNLOAD):
+        """Fetch a snapshot in the background when none is on disk; the fallback tables serve meanwhile"""
+        if download and not self.available_versions():
+            threading.Thread(target=self._download_and_load, daemon=True, name='static-data').start()
+
+
+def download_snapshot(version=None, root=DDRAGON_PATH, language=DDRAGON_LANGUAGE):
+    """Download the champion, summoner spell and profile icon data for a patch"""
+    if version is None:
+        version = requests.get(f"{DDRAGON_CDN}/api/versions.json", timeout=10).json()[0]
+    data_dir = os.path.join(root, version, 'data', language)
+    os.makedirs(data_dir, exist_ok=True)
+    # champion.json marks a snapshot as available, so it is written last and
+    # every file is renamed into place; other workers never see partial data
+    for name in ('summoner.json', 'profileicon.json', 'champion.json'):
+        response = requests.get(f"{DDRAGON_CDN}/cdn/{version}/data/{language}/{name}", timeout=30)
+        response.raise_for_status()
+        tmp_path = os.path.join(data_dir, f"{name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(response.content)
+        os.replace(tmp_path, os.path.join(data_dir, name))
+    return version
+
+
+if __name__ == '__main__':
+    # python static_data.py download [version]
+    if len(sys.argv) >= 2 and sys.argv[1] == 'download':
+        print(f"Downloaded Data Dragon {download_snapshot(sys.argv[2] if len(sys.argv) > 2 else None)}")
+    else:
+        print("Usage: python static_data.py download [version]")
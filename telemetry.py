@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import random
+import sys
+import threading
+from bisect import bisect_left
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Share of routine (non-warning) log events that are actually written
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+
+logger = logging.getLogger('lolstats')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+class Metrics:
+    """In-process counters and histograms rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def cache(self, cache, hit):
+        self.inc('cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+    def upstream(self, service, endpoint, status, seconds):
+        """One upstream response: latency histogram plus a per-status counter"""
+        self.observe('upstream_request_duration_seconds', seconds, service=service, endpoint=endpoint)
+        self.inc('upstream_responses_total', service=service, endpoint=endpoint, status=status)
+
+    def render(self):
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (list(h.counts), h.total, h.count, h.buckets)) for key, h in self._histograms.items()
+            )
+        lines = []
+        described = set()
+
+        def header(name, kind):
+            if name not in described:
+                described.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        for (name, labels), (counts, total, count, buckets) in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{name}_count{format_labels(labels)} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {'time': round(record.created, 3), 'level': record.levelname.lower(), 'event': record.getMessage()}
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level=None):
+    """One JSON object per line on stdout; Cloud Run picks these up as structured logs"""
+    if logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level or os.getenv('LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+
+
+def log_event(event, level=logging.INFO, sample=None, **fields):
+    """Structured log line; routine events below WARNING are sampled at LOG_SAMPLE_RATE"""
+    if level < logging.WARNING:
+        rate = LOG_SAMPLE_RATE if sample is None else sample
+        if rate < 1.0 and random.random() >= rate:
+            return
+    if logger.isEnabledFor(level):
+        logger.log(level, event, extra={'fields': fields})
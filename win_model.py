@@ -0,0 +1,157 @@
+import math
+from array import array
+
+TIER_BASE = {
+    'IRON': 0, 'BRONZE': 400, 'SILVER': 800, 'GOLD': 1200, 'PLATINUM': 1600,
+    'EMERALD': 2000, 'DIAMOND': 2400, 'MASTER': 2800, 'GRANDMASTER': 2800, 'CHALLENGER': 2800,
+}
+APEX_TIERS = {'MASTER', 'GRANDMASTER', 'CHALLENGER'}
+DIVISION_BONUS = {'IV': 0, 'III': 100, 'II': 200, 'I': 300}
+
+# Rating assumed for unranked players (roughly SILVER I)
+UNRANKED_RATING = 1100.0
+# Rating points per unit of smoothed win rate above/below 50%
+WINRATE_WEIGHT = 400.0
+# Pseudo-games used to smooth the win rate of players with few games
+WINRATE_PRIOR_GAMES = 20
+# Rating points per unit of champion win rate above/below 50%
+CHAMPION_WEIGHT = 800.0
+# Team rating difference that gives 10:1 odds; solo queue is noisy, so it is wide
+LOGISTIC_SCALE = 1600.0
+# Exponent bound for the odds; beyond it the rounded percentage is 0 or 100 anyway
+MAX_ODDS_EXPONENT = 30.0
+
+
+def player_rating_columns(tiers, divisions, lps, wins, losses):
+    """Rating for each player, computed over parallel column sequences"""
+    n = len(tiers)
+    ratings = array('d', [0.0]) * n
+    for i in range(n):
+        tier = tiers[i]
+        if tier not in TIER_BASE:
+            ratings[i] = UNRANKED_RATING
+            continue
+        if tier in APEX_TIERS:
+            # Apex tiers have no divisions and uncapped LP
+            base = TIER_BASE[tier] + lps[i]
+        else:
+            base = TIER_BASE[tier] + DIVISION_BONUS.get(divisions[i], 0) + min(lps[i], 100)
+        games = wins[i] + losses[i]
+        smoothed = (wins[i] + WINRATE_PRIOR_GAMES / 2) / (games + WINRATE_PRIOR_GAMES)
+        ratings[i] = base + (smoothed - 0.5) * WINRATE_WEIGHT
+    return ratings
+
+
+def rating_to_label(rating):
+    """Human readable tier/division for an average rating"""
+    if rating >= TIER_BASE['MASTER']:
+        return f"MASTER {int(rating - TIER_BASE['MASTER'])} LP"
+    for tier, base in sorted(TIER_BASE.items(), key=lambda item: -item[1]):
+        if tier in APEX_TIERS or rating < base:
+            continue
+        division_index = min(3, int((rating - base) // 100))
+        return f"{tier} {['IV', 'III', 'II', 'I'][division_index]}"
+    return 'IRON IV'
+
+
+# Upper bounds for rank numbers accepted from clients, well above anything real
+RANK_NUMBERS = {'leaguePoints': 10000, 'wins': 100000, 'losses': 100000}
+RANK_STRINGS = ('tier', 'rank')
+
+
+def lobby_error(lobby):
+    """Why ``lobby`` (a {"team1": [...], "team2": [...]} dict) can't be scored, or None"""
+    if not isinstance(lobby, dict):
+        return 'must be an object with team1 and team2'
+    for team_name in ('team1', 'team2'):
+        team = lobby.get(team_name, [])
+        if not isinstance(team, list):
+            return f"{team_name} must be a list of players"
+        for position, player in enumerate(team):
+            where = f"{team_name}[{position}]"
+            if not isinstance(player, dict):
+                return f"{where} must be an object"
+            champion_id = player.get('championId')
+            if champion_id is not None and (isinstance(champion_id, bool) or not isinstance(champion_id, int)):
+                return f"{where}.championId must be an integer"
+            rank = player.get('rank')
+            if rank is None:
+                continue
+            if not isinstance(rank, dict):
+                return f"{where}.rank must be an object"
+            for field in RANK_STRINGS:
+                if field in rank and not isinstance(rank[field], str):
+                    return f"{where}.rank.{field} must be a string"
+            for field, upper in RANK_NUMBERS.items():
+                if field not in rank:
+                    continue
+                value = rank[field]
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    return f"{where}.rank.{field} must be a number"
+                # NaN and Infinity get through Flask's JSON parser
+                if not math.isfinite(value) or not 0 <= value <= upper:
+                    return f"{where}.rank.{field} must be between 0 and {upper}"
+    return None
+
+
+def predict_batch(lobbies, champion_strength=None):
+    """Score many lobbies at once.
+
+    ``lobbies`` is a sequence of ``(team1, team2)`` pairs of participant
+    dicts as built in get_live_game. ``champion_strength`` optionally maps
+    champion ID to that champion's win rate (0..1). Returns one prediction
+    dict per lobby, in the same shape the live-game API has always used.
+    """
+    champion_strength = champion_strength or {}
+
+    # Flatten every player of every lobby into columns
+    tiers, divisions, lps, wins, losses = [], [], array('d'), array('d'), array('d')
+    champion_bonus, lobby_index, team_index = array('d'), array('l'), array('b')
+    for index, (team1, team2) in enumerate(lobbies):
+        for team, players in ((0, team1), (1, team2)):
+            for player in players:
+                rank = player.get('rank') or {}
+                tiers.append(rank.get('tier', 'UNRANKED'))
+                divisions.append(rank.get('rank', ''))
+                lps.append(rank.get('leaguePoints', 0))
+                wins.append(rank.get('wins', 0))
+                losses.append(rank.get('losses', 0))
+                champion_rate = champion_strength.get(player.get('championId'))
+                champion_bonus.append(0.0 if champion_rate is None else (champion_rate - 0.5) * CHAMPION_WEIGHT)
+                lobby_index.append(index)
+                team_index.append(team)
+
+    ratings = player_rating_columns(tiers, divisions, lps, wins, losses)
+
+    # Segment sums per (lobby, team)
+    sums = array('d', [0.0]) * (2 * len(lobbies))
+    counts = array('l', [0]) * (2 * len(lobbies))
+    for i in range(len(ratings)):
+        slot = 2 * lobby_index[i] + team_index[i]
+        sums[slot] += ratings[i] + champion_bonus[i]
+        counts[slot] += 1
+
+    predictions = []
+    for index in range(len(lobbies)):
+        team1_rating = sums[2 * index] / counts[2 * index] if counts[2 * index] else UNRANKED_RATING
+        team2_rating = sums[2 * index + 1] / counts[2 * index + 1] if counts[2 * index + 1] else UNRANKED_RATING
+        exponent = (team2_rating - team1_rating) / LOGISTIC_SCALE
+        exponent = max(-MAX_ODDS_EXPONENT, min(MAX_ODDS_EXPONENT, exponent))
+        team1_chance = 1.0 / (1.0 + math.pow(10.0, exponent))
+        team1_percent = int(round(team1_chance * 100))
+        predictions.append({
+            'team1_win_chance': team1_percent,
+            'team2_win_chance': 100 - team1_percent,
+            'reasoning': (
+                f"Średni poziom drużyny niebieskiej: {rating_to_label(team1_rating)}, "
+                f"czerwonej: {rating_to_label(team2_rating)}. "
+                f"Przewidywanie na podstawie rang, LP i winrate graczy."
+            ),
+            'source': 'model',
+        })
+    return predictions
+
+
+def predict(team1, team2, champion_strength=None):
+    """Predict a single lobby"""
+    return predict_batch([(team1, team2)], champion_strength)[0]